@@ -0,0 +1,27 @@
+"""Index announcements in cursor order
+
+Revision ID: add_cursor_indexes
+Revises: add_ranking_indexes
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_cursor_indexes'
+down_revision = 'add_ranking_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Announcements page by (is_pinned, id) descending; id follows created_at and is unique
+    op.create_index('ix_announcements_tournament_id_pinned_id', 'announcements',
+                    ['tournament_id', 'is_pinned', 'id'], unique=False)
+    op.drop_index('ix_announcements_tournament_id_pinned_created', table_name='announcements')
+
+
+def downgrade():
+    op.create_index('ix_announcements_tournament_id_pinned_created', 'announcements',
+                    ['tournament_id', 'is_pinned', 'created_at'], unique=False)
+    op.drop_index('ix_announcements_tournament_id_pinned_id', table_name='announcements')
@@ -0,0 +1,46 @@
+"""Add composite indexes for hot query paths
+
+Revision ID: add_hot_path_indexes
+Revises: add_knockout_bracket
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'add_knockout_bracket'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_teams_tournament_id', 'teams', ['tournament_id']),
+    ('ix_players_team_id', 'players', ['team_id']),
+    ('ix_rounds_tournament_id_round_number', 'rounds', ['tournament_id', 'round_number']),
+    ('ix_matches_tournament_id_round_number', 'matches', ['tournament_id', 'round_number']),
+    ('ix_matches_tournament_id_white_team', 'matches', ['tournament_id', 'white_team_id', 'is_completed', 'label']),
+    ('ix_matches_tournament_id_black_team', 'matches', ['tournament_id', 'black_team_id', 'is_completed', 'label']),
+    ('ix_matches_tournament_id_bracket_slot', 'matches', ['tournament_id', 'bracket_slot']),
+    ('ix_matches_round_id', 'matches', ['round_id']),
+    ('ix_games_match_id_board_number', 'games', ['match_id', 'board_number']),
+    ('ix_games_white_player_id', 'games', ['white_player_id']),
+    ('ix_games_black_player_id', 'games', ['black_player_id']),
+    ('ix_announcements_tournament_id_pinned_created', 'announcements', ['tournament_id', 'is_pinned', 'created_at']),
+]
+
+
+def upgrade():
+    # Matches and games are the large tables; build without blocking writes where the server allows it
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,40 @@
+"""Add knockout bracket size and match slots
+
+Revision ID: add_knockout_bracket
+Revises: add_stats_version
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_knockout_bracket'
+down_revision = 'add_stats_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Enum values are stored by name; new values cannot be added inside a transaction on older servers
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE tournamentstage ADD VALUE IF NOT EXISTS 'knockout'")
+            op.execute("ALTER TYPE matchlabel ADD VALUE IF NOT EXISTS 'knockout'")
+            op.execute("ALTER TYPE tournamentformat ADD VALUE IF NOT EXISTS 'swiss'")
+
+    op.add_column('tournaments', sa.Column('knockout_size', sa.Integer(), nullable=True))
+    op.add_column('matches', sa.Column('bracket_slot', sa.Integer(), nullable=True))
+
+    # Existing group + knockout tournaments all have the fixed four-team bracket
+    op.execute("UPDATE tournaments SET knockout_size = 4 WHERE format = 'group_knockout'")
+    op.execute(
+        "UPDATE matches SET bracket_slot = CASE label "
+        "WHEN 'SF1' THEN 1 WHEN 'SF2' THEN 2 WHEN 'Final' THEN 3 WHEN 'Place3rd' THEN 4 END "
+        "WHERE label != 'group'"
+    )
+
+
+def downgrade():
+    op.drop_column('matches', 'bracket_slot')
+    op.drop_column('tournaments', 'knockout_size')
@@ -0,0 +1,40 @@
+"""Add indexes in standings and best players order
+
+Revision ID: add_ranking_indexes
+Revises: add_round_snapshots
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_ranking_indexes'
+down_revision = 'add_round_snapshots'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_teams_standings', 'teams', [
+        sa.text('tournament_id'), sa.text('"group"'), sa.text('match_points DESC'), sa.text('game_points DESC'),
+        sa.text('sonneborn_berger DESC'), sa.text('manual_tb4'),
+    ]),
+    ('ix_players_ranking', 'players', [sa.text('points DESC'), sa.text('wins DESC'), sa.text('manual_tb3')]),
+]
+
+
+def upgrade():
+    # Lets a page of /standings or /best-players read its rows in order instead of sorting the whole table
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,55 @@
+"""Add per-round standings and best players snapshots
+
+Revision ID: add_round_snapshots
+Revises: add_hot_path_indexes
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_round_snapshots'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Written in one bulk insert per table when a round is completed; keyed for "after round N" reads
+    op.create_table('team_round_snapshots',
+        sa.Column('tournament_id', sa.Integer(), nullable=False),
+        sa.Column('round_number', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('group', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('matches_played', sa.Integer(), nullable=False),
+        sa.Column('wins', sa.Integer(), nullable=False),
+        sa.Column('draws', sa.Integer(), nullable=False),
+        sa.Column('match_points', sa.Float(), nullable=False),
+        sa.Column('game_points', sa.Float(), nullable=False),
+        sa.Column('sonneborn_berger', sa.Float(), nullable=False),
+        sa.Column('manual_tb4', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['tournament_id'], ['tournaments.id'], ),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tournament_id', 'round_number', 'team_id')
+    )
+    op.create_table('player_round_snapshots',
+        sa.Column('tournament_id', sa.Integer(), nullable=False),
+        sa.Column('round_number', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=False),
+        sa.Column('wins', sa.Integer(), nullable=False),
+        sa.Column('draws', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Float(), nullable=False),
+        sa.Column('tb3', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['tournament_id'], ['tournaments.id'], ),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tournament_id', 'round_number', 'player_id')
+    )
+
+
+def downgrade():
+    op.drop_table('player_round_snapshots')
+    op.drop_table('team_round_snapshots')
@@ -0,0 +1,24 @@
+"""Add tournament stats version
+
+Revision ID: add_stats_version
+Revises: add_tournament_version
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_stats_version'
+down_revision = 'add_tournament_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Version the stored team/player totals were last recomputed for; behind `version` while a deferred recompute is queued
+    op.add_column('tournaments', sa.Column('stats_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('tournaments', 'stats_version')
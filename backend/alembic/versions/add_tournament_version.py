@@ -0,0 +1,24 @@
+"""Add tournament data version
+
+Revision ID: add_tournament_version
+Revises: add_announcements
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_tournament_version'
+down_revision = 'add_announcements'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bumped by every write that changes standings or best players
+    op.add_column('tournaments', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('tournaments', 'version')
@@ -0,0 +1,49 @@
+"""Index standings in exactly their sort order, drop the players ranking index
+
+Revision ID: reorder_ranking_indexes
+Revises: add_cursor_indexes
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'reorder_ranking_indexes'
+down_revision = 'add_cursor_indexes'
+branch_labels = None
+depends_on = None
+
+STANDINGS_ORDER = [
+    sa.text('tournament_id'), sa.text('"group"'), sa.text('match_points DESC'), sa.text('game_points DESC'),
+    sa.text('sonneborn_berger DESC'), sa.text('(manual_tb4 IS NULL)'), sa.text('manual_tb4'), sa.text('id'),
+]
+OLD_INDEXES = [
+    ('ix_teams_standings', 'teams', [
+        sa.text('tournament_id'), sa.text('"group"'), sa.text('match_points DESC'), sa.text('game_points DESC'),
+        sa.text('sonneborn_berger DESC'), sa.text('manual_tb4'),
+    ]),
+    # Not per tournament, so a tournament's best players never read it
+    ('ix_players_ranking', 'players', [sa.text('points DESC'), sa.text('wins DESC'), sa.text('manual_tb3')]),
+]
+
+
+def upgrade():
+    # The old standings index left unset tiebreaks and the id tiebreaker to a sort after the index read
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        with op.get_context().autocommit_block():
+            op.create_index('ix_teams_standings_order', 'teams', STANDINGS_ORDER, unique=False,
+                            postgresql_concurrently=True)
+            for name, table, _ in OLD_INDEXES:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.create_index('ix_teams_standings_order', 'teams', STANDINGS_ORDER, unique=False)
+        for name, table, _ in OLD_INDEXES:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade():
+    for name, table, columns in OLD_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    op.drop_index('ix_teams_standings_order', table_name='teams')
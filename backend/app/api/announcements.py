@@ -1,21 +1,32 @@
 ### backend/app/api/announcements.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from .. import crud, schemas
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from .. import crud, async_crud, schemas
+from ..database import get_db, get_async_db
 from ..utilities.auth import get_current_user
+from ..utilities import live
+from ..utilities.pagination import MAX_PAGE_SIZE, page_headers
 
 router = APIRouter(prefix="/api", tags=["announcements"])
 
 @router.get("/tournaments/{tournament_id}/announcements", response_model=schemas.AnnouncementListResponse)
-def get_tournament_announcements(
+async def get_tournament_announcements(
     tournament_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; every announcement when neither limit nor cursor is given"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    total: bool = Query(False, description="Count every announcement and send it as X-Total-Count"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all announcements for a tournament, ordered by pinned status and creation date"""
-    announcements = crud.get_tournament_announcements(db, tournament_id)
-    return {"announcements": announcements}
+    """Get a page of a tournament's announcements, ordered by pinned status and creation date"""
+    try:
+        page = await async_crud.get_tournament_announcements(db, tournament_id, limit, cursor, with_total=total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers.update(page_headers(page))
+    return {"announcements": page.items}
 
 @router.post("/tournaments/{tournament_id}/announcements", response_model=schemas.AnnouncementResponse)
 def create_announcement(
@@ -33,7 +44,12 @@ def create_announcement(
     # Set the tournament_id from the URL
     announcement.tournament_id = tournament_id
     
-    return crud.create_announcement(db, announcement)
+    created = crud.create_announcement(db, announcement)
+    live.publish(tournament_id, "announcement_posted", _announcement_event(created))
+    return created
+
+def _announcement_event(announcement) -> dict:
+    return {"id": announcement.id, "title": announcement.title, "is_pinned": announcement.is_pinned}
 
 @router.put("/announcements/{announcement_id}", response_model=schemas.AnnouncementResponse)
 def update_announcement(
@@ -47,7 +63,9 @@ def update_announcement(
     if not announcement:
         raise HTTPException(status_code=404, detail="Announcement not found")
     
-    return crud.update_announcement(db, announcement_id, announcement_update)
+    updated = crud.update_announcement(db, announcement_id, announcement_update)
+    live.publish(updated.tournament_id, "announcement_updated", _announcement_event(updated))
+    return updated
 
 @router.delete("/announcements/{announcement_id}")
 def delete_announcement(
@@ -60,5 +78,7 @@ def delete_announcement(
     if not announcement:
         raise HTTPException(status_code=404, detail="Announcement not found")
     
+    tournament_id = announcement.tournament_id
     crud.delete_announcement(db, announcement_id)
+    live.publish(tournament_id, "announcement_deleted", {"id": announcement_id})
     return {"message": "Announcement deleted successfully"}
@@ -1,31 +1,123 @@
 ### backend/app/api/matches.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from ..models import Game, Match, Round, Player
-from ..database import get_db
-from ..schemas import MatchResponse, SwapPlayersRequest , ResultUpdate
+from ..database import get_db, get_async_db
+from ..schemas import MatchResponse, SwapPlayersRequest , ResultUpdate, BatchResultRequest, BatchResultResponse
 from ..utilities.auth import get_current_user
-from .. import crud
-from ..utilities.tournament import recalculate_round_stats
+from ..utilities.pagination import MAX_PAGE_SIZE, page_response
+from .. import async_crud
+from ..utilities import recalc, live
+from ..utilities.stats import GAME_SCORES, apply_game_results
 from ..enums import MatchResult ,MatchLabel ,Tiebreaker
 
 router = APIRouter(prefix="/api/matches", tags=["matches"])
 
 @router.get("/{tournament_id}/{round_number}", response_model=List[MatchResponse])
-def get_matches(tournament_id: int, round_number: int, db: Session = Depends(get_db)):
+async def get_matches(
+    tournament_id: int,
+    round_number: int,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; every match when neither limit nor cursor is given"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    total: bool = Query(False, description="Count every row and send it as X-Total-Count"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    round_obj = await async_crud.get_round(db, tournament_id, round_number)
+    
+    if not round_obj:
+        # Knockout rounds only exist once the rounds feeding them are complete
+        total_rounds = await async_crud.get_total_rounds(db, tournament_id)
+        if total_rounds and 1 <= round_number <= total_rounds:
+            return []
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Round {round_number} not found for tournament {tournament_id}"
+        )
+    
+    try:
+        page = await async_crud.get_matches(db, round_number, tournament_id, limit, cursor, with_total=total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return page_response(page, MatchResponse)
+
+@router.post("/results:batch", response_model=BatchResultResponse)
+def submit_results_batch(
+    batch: BatchResultRequest,
+    db: Session = Depends(get_db),
+    _: dict = Depends(get_current_user)
+):
+    """Submit many board results at once; valid entries are applied together, invalid ones reported"""
+    if not batch.results:
+        raise HTTPException(status_code=400, detail="No results submitted")
+    statuses = apply_game_results(db, batch.results)
+    _publish_batch(db, statuses)
+    return _batch_response(statuses)
+
+@router.post("/{tournament_id}/{round_number}/results:batch", response_model=BatchResultResponse)
+def submit_round_results_batch(
+    tournament_id: int,
+    round_number: int,
+    batch: BatchResultRequest,
+    db: Session = Depends(get_db),
+    _: dict = Depends(get_current_user)
+):
+    """Submit a round's scoresheets at once; entries outside the round are rejected"""
     round_obj = db.query(Round).filter(
         Round.tournament_id == tournament_id,
         Round.round_number == round_number
     ).first()
-    
     if not round_obj:
         raise HTTPException(
-            status_code=404, 
+            status_code=404,
             detail=f"Round {round_number} not found for tournament {tournament_id}"
         )
-    
-    return crud.get_matches(db,round_number,tournament_id)
+    if not batch.results:
+        raise HTTPException(status_code=400, detail="No results submitted")
+    statuses = apply_game_results(db, batch.results, tournament_id, round_number)
+    _publish_batch(db, statuses)
+    return _batch_response(statuses)
+
+def _publish_batch(db: Session, statuses):
+    boards = {}
+    for s in statuses:
+        if s["status"] == "applied":
+            boards.setdefault(s["match_id"], set()).add(s["board_number"])
+    if not boards:
+        return
+    for (tournament_id,) in db.query(Match.tournament_id).filter(Match.id.in_(boards)).distinct().all():
+        _publish_matches(db, tournament_id, boards)
+        live.publish_standings(db, tournament_id)
+
+def _publish_matches(db: Session, tournament_id: int, boards):
+    """Push the changed boards per match id, and each match's final score once all its boards are in."""
+    if not live.broker.has_subscribers(tournament_id):
+        return
+    matches = db.query(Match).options(selectinload(Match.games)).filter(
+        Match.tournament_id == tournament_id, Match.id.in_(boards)
+    ).all()
+    for match in matches:
+        _publish_match(match, boards[match.id])
+
+def _publish_match(match: Match, boards):
+    for game in match.games:
+        if game.board_number in boards:
+            live.publish(match.tournament_id, "game_result", {
+                "match_id": match.id, "board_number": game.board_number, "result": game.result.value
+            })
+    if match.is_completed:
+        live.publish(match.tournament_id, "match_completed", {
+            "match_id": match.id,
+            "white_score": match.white_score,
+            "black_score": match.black_score,
+            "result": match.result.value,
+            "tiebreaker": match.tiebreaker.value,
+        })
+
+def _batch_response(statuses):
+    applied = sum(1 for s in statuses if s["status"] == "applied")
+    return {"applied": applied, "rejected": len(statuses) - applied, "results": statuses}
 
 @router.post("/{match_id}/result")
 def submit_board_result(
@@ -35,7 +127,6 @@ def submit_board_result(
     db: Session = Depends(get_db),
     _: dict = Depends(get_current_user)
 ):
-    match = db.query(Match).filter(Match.id == match_id).first()
     game = (
         db.query(Game)
         .filter(Game.match_id == match_id, Game.board_number == board_number)
@@ -44,32 +135,12 @@ def submit_board_result(
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    if update.result == MatchResult.white_win:
-        game.white_score = 1.0
-        game.black_score = 0.0
-        game.result = update.result
-        game.is_completed = True
-    elif update.result == MatchResult.black_win:
-        game.white_score = 0.0
-        game.black_score = 1.0
-        game.result = update.result
-        game.is_completed = True
-    elif update.result == MatchResult.draw:
-        game.white_score = 0.5
-        game.black_score = 0.5
-        game.result = update.result
-        game.is_completed = True
-    elif update.result == MatchResult.pending:
-        game.white_score = 0.0
-        game.black_score = 0.0
-        game.result = update.result
-        game.is_completed = False
-    else:
+    if update.result not in GAME_SCORES:
         raise HTTPException(status_code=400, detail=f"Invalid result: {update.result}")
-    
-    db.commit()
 
-    recalculate_round_stats(db, match.tournament_id, match.round_number)
+    tournament_id = game.match.tournament_id
+    recalc.submit_game_result(db, game, update.result)
+    _publish_matches(db, tournament_id, {match_id: {board_number}})
 
     return {"message": f"Game result '{update.result}' submitted successfully"}
 
@@ -92,14 +163,16 @@ def submit_tiebreaker_result(
 
     # Convert MatchResult to Tiebreaker enum
     if update.result == MatchResult.white_win:
-        match.tiebreaker = Tiebreaker.white_win
+        tiebreaker = Tiebreaker.white_win
     elif update.result == MatchResult.black_win:
-        match.tiebreaker = Tiebreaker.black_win
+        tiebreaker = Tiebreaker.black_win
     else:  # update.result == MatchResult.pending
-        match.tiebreaker = Tiebreaker.pending
-    db.commit()
+        tiebreaker = Tiebreaker.pending
 
-    recalculate_round_stats(db, match.tournament_id, match.round_number)
+    tournament_id = match.tournament_id
+    recalc.submit_tiebreaker_result(db, match, tiebreaker)
+    live.publish(tournament_id, "tiebreaker_set", {"match_id": match_id, "tiebreaker": tiebreaker.value})
+    _publish_matches(db, tournament_id, {match_id: set()})
 
     return {
         "message": "Tiebreaker result recorded",
@@ -191,7 +264,8 @@ def swap_players(
         return 
 
     db.commit()
-    recalculate_round_stats(db, match.tournament_id, match.round_number)
+    recalc.submit_round_change(db, match.tournament_id, match.round_number)
+    live.publish(match.tournament_id, "lineup_changed", {"match_id": match_id})
 
 @router.post("/{match_id}/swap-colors")
 def swap_match_colors(
@@ -216,6 +290,7 @@ def swap_match_colors(
         game.white_player_id, game.black_player_id = game.black_player_id, game.white_player_id
 
     db.commit()
-    recalculate_round_stats(db, match.tournament_id, match.round_number)
+    recalc.submit_round_change(db, match.tournament_id, match.round_number)
+    live.publish(match.tournament_id, "lineup_changed", {"match_id": match_id})
 
     return {"message": "Team colors swapped successfully", "match_id": match_id}
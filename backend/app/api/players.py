@@ -1,24 +1,34 @@
 ### backend/app/api/players.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import or_
 from typing import List, Optional
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models import Game
 from ..schemas import PlayerResponse, PlayerCreate, PlayerUpdate
 from ..utilities.auth import get_current_user
-from .. import crud
+from ..utilities.pagination import MAX_PAGE_SIZE, page_response
+from .. import crud, async_crud
 
 router = APIRouter(prefix="/api/players", tags=["players"])
 
 @router.get("", response_model=List[PlayerResponse])
-def list_players(team_id: Optional[int] = None, tournament_id: Optional[int] = None,
-                 db: Session = Depends(get_db)):
-    return crud.get_players(db, team_id=team_id, tournament_id=tournament_id)
+async def list_players(team_id: Optional[List[int]] = Query(None, description="One or more teams; repeat to list several"),
+                       tournament_id: Optional[int] = None,
+                       limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; every player when neither limit nor cursor is given"),
+                       cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+                       total: bool = Query(False, description="Count every row and send it as X-Total-Count"),
+                       db: AsyncSession = Depends(get_async_db)):
+    try:
+        page = await async_crud.get_players(db, limit, cursor, team_ids=team_id, tournament_id=tournament_id, with_total=total)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+    return page_response(page, PlayerResponse)
 
 @router.get("/{player_id}", response_model=PlayerResponse)
-def get_player(player_id: int, db: Session = Depends(get_db)):
-    player = crud.get_player(db, player_id)
+async def get_player(player_id: int, db: AsyncSession = Depends(get_async_db)):
+    player = await async_crud.get_player(db, player_id)
     if not player:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Player not found")
     return player
@@ -0,0 +1,40 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Body, Depends
+from ..utilities.auth import create_token, get_current_user, rotate_secret, token_cache
+from ..utilities.pool import pool_stats
+from ..utilities.live import broker
+from ..utilities.compression import compression_stats
+
+router = APIRouter(prefix="/api/system", tags=["system"])
+
+@router.get("/pool")
+def get_pool_stats(_: dict = Depends(get_current_user)):
+    """Connection pool settings, current usage, checkout waits, connect times and overflow/timeout counters per engine"""
+    return pool_stats()
+
+@router.get("/live")
+async def get_live_stats(_: dict = Depends(get_current_user)):
+    """Live feed subscribers per tournament, events published and slow-subscriber resyncs"""
+    return broker.stats()
+
+@router.get("/auth")
+def get_auth_stats(_: dict = Depends(get_current_user)):
+    """Verified-token cache size, hits, misses, hit rate, expiries, evictions and secret-rotation invalidations"""
+    return token_cache.stats()
+
+@router.post("/auth/rotate")
+def rotate_auth_secret(secret: Optional[str] = Body(None, embed=True, min_length=32),
+                       current_user: dict = Depends(get_current_user)):
+    """
+    Sign with a new secret (a random one unless given) and forget every verified token. Every token
+    issued so far stops working, so the caller gets a fresh one. With several workers, send the same
+    secret to each, or set JWT_SECRET and restart them instead.
+    """
+    rotate_secret(secret or secrets.token_urlsafe(48))
+    return {"token": create_token(current_user["user"])}
+
+@router.get("/compression")
+def get_compression_stats(_: dict = Depends(get_current_user)):
+    """Responses compressed and sent uncompressed per route, with bytes before and after compression"""
+    return compression_stats()
@@ -1,21 +1,31 @@
 ### backend/app/api/teams.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_db, get_async_db
 from ..utilities.auth import get_current_user
+from ..utilities.pagination import MAX_PAGE_SIZE, page_response
 from ..schemas import TeamResponse,TeamUpdate
-from .. import crud
+from .. import crud, async_crud
 
 router = APIRouter(prefix="/api/teams", tags=["teams"])
 
 @router.get("", response_model=List[TeamResponse])
-def list_teams(tournament_id: int, db: Session = Depends(get_db)):
-    return crud.get_teams(db, tournament_id)
+async def list_teams(tournament_id: int,
+                     limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; every team when neither limit nor cursor is given"),
+                     cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+                     total: bool = Query(False, description="Count every row and send it as X-Total-Count"),
+                     db: AsyncSession = Depends(get_async_db)):
+    try:
+        page = await async_crud.get_teams(db, tournament_id, limit, cursor, with_total=total)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+    return page_response(page, TeamResponse)
 
 @router.get("/{team_id}", response_model=TeamResponse)
-def get_team(team_id: int, db: Session = Depends(get_db)):
-    team = crud.get_team(db, team_id)
+async def get_team(team_id: int, db: AsyncSession = Depends(get_async_db)):
+    team = await async_crud.get_team(db, team_id)
     if not team:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Team not found")
     return team
@@ -1,39 +1,110 @@
 ### backend/app/api/tournaments.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional,Dict,Any
-from ..database import get_db
+import os
+import tempfile
+from ..database import get_db, get_async_db, SessionLocal
 from ..utilities.auth import get_current_user
-from ..schemas import TournamentResponse, TournamentCreate, TournamentUpdate, StandingsResponse, BestPlayersResponse,RoundRescheduleRequest
-from .. import crud
-from ..utilities import tournament 
+from ..schemas import TournamentResponse, TournamentCreate, TournamentUpdate, StandingsResponse, BestPlayersResponse, ProgressionResponse,RoundRescheduleRequest
+from .. import crud, async_crud
+from ..utilities import tournament, cache, recalc, live, ties, archive
+from ..utilities.stats import verify_tournament_stats
+from ..utilities.pagination import MAX_PAGE_SIZE, page_response
 from ..models import Match,Round,Team,Player
 from ..enums import TournamentStage,TournamentFormat
 
 router = APIRouter(prefix="/api/tournaments", tags=["tournaments"])
 
 @router.get("/current", response_model=Optional[TournamentResponse])
-def get_current_tournament(db: Session = Depends(get_db)):
-    tour = crud.get_current_tournament(db)
+async def get_current_tournament(db: AsyncSession = Depends(get_async_db)):
+    tour = await async_crud.get_current_tournament(db)
     return tour
 
 @router.get("/{tournament_id}", response_model=TournamentResponse)
-def get_tournament(tournament_id: int, db: Session = Depends(get_db)):
-    tour = crud.get_tournament(db, tournament_id)
+async def get_tournament(tournament_id: int, db: AsyncSession = Depends(get_async_db)):
+    tour = await async_crud.get_tournament(db, tournament_id)
     if not tour:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
     return tour
 
 @router.get("/", response_model=List[TournamentResponse])
-def get_tournaments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_tournaments(db, skip=skip, limit=limit)
+async def get_tournaments(
+    skip: int = Query(0, ge=0, description="Offset paging for older clients; prefer cursor"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    total: bool = Query(False, description="Count every row and send it as X-Total-Count"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        page = await async_crud.get_tournaments(db, limit, cursor, skip=skip, with_total=total)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+    return page_response(page, TournamentResponse)
 
 @router.post("/", response_model=TournamentResponse)
 def create_tournament(tournament: TournamentCreate, db: Session = Depends(get_db),
                       _: dict = Depends(get_current_user)):
-    new_tour = crud.create_tournament(db, tournament)
+    try:
+        new_tour = crud.create_tournament(db, tournament)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
     return new_tour
 
+# Uploaded archives stay in memory up to this size and spill to a temporary file beyond it
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+# Larger uploads are refused with 413 rather than spooled to disk without end
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+@router.post("/import")
+async def import_tournament(request: Request, _: dict = Depends(get_current_user)):
+    """Load an archive from the export endpoint as a new tournament, with new ids, in one transaction"""
+    def load(source):
+        db = SessionLocal()
+        try:
+            return archive.import_lines(db, source)
+        finally:
+            db.close()
+
+    too_large = HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                              f"Archive larger than {IMPORT_MAX_BYTES} bytes")
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > IMPORT_MAX_BYTES:
+        raise too_large
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+        received = 0
+        async for chunk in request.stream():
+            # Content-Length may be absent (chunked upload) or wrong, so the bytes are counted as they arrive
+            received += len(chunk)
+            if received > IMPORT_MAX_BYTES:
+                raise too_large
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            return await run_in_threadpool(load, spool)
+        except ValueError as e:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+@router.get("/{tournament_id}/export")
+def export_tournament(tournament_id: int, db: Session = Depends(get_db), _: dict = Depends(get_current_user)):
+    """The tournament with its teams, players, rounds, matches, games and announcements as line-delimited JSON"""
+    if not crud.get_tournament(db, tournament_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
+
+    def lines():
+        # The request's session is closed once the response starts, so the stream reads through its own
+        session = SessionLocal()
+        try:
+            yield from archive.export_lines(session, tournament_id)
+        finally:
+            session.close()
+    return StreamingResponse(lines(), media_type=archive.MEDIA_TYPE, headers={
+        "Content-Disposition": f'attachment; filename="tournament-{tournament_id}.ndjson"'
+    })
+
 @router.put("/{tournament_id}", response_model=TournamentResponse)
 def update_tournament(tournament_id: int, tour_upd: TournamentUpdate, db: Session = Depends(get_db),
                       _: dict = Depends(get_current_user)):
@@ -48,6 +119,7 @@ def delete_tournament(tournament_id: int, db: Session = Depends(get_db),
     success = crud.delete_tournament(db, tournament_id)
     if not success:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
+    cache.invalidate(tournament_id)
     return {"message": "Tournament deleted successfully"}
 
 @router.post("/{tournament_id}/set-current", response_model=TournamentResponse)
@@ -58,27 +130,119 @@ def set_current_tournament(tournament_id: int, db: Session = Depends(get_db),
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
     return updated
 
+def _check_ties_unpaged(include_ties: bool, limit: Optional[int], offset: int):
+    # A tie cluster and its rank depend on rows outside any page, so clusters are only found over the whole ranking
+    if include_ties and (limit is not None or offset):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "ties cannot be combined with limit or offset")
+
+def _response_kind(kind: str, after_round: Optional[int], include_ties: bool, places: Optional[int],
+                   limit: Optional[int], offset: int) -> str:
+    if after_round is not None:
+        kind += f"-after-{after_round}"
+    if limit is not None or offset:
+        kind += f"-page-{offset}-{limit or 'all'}"
+    return f"{kind}-ties-{places or 'all'}" if include_ties else kind
+
 @router.get("/{tournament_id}/standings", response_model=StandingsResponse)
-def get_standings(tournament_id: int, db: Session = Depends(get_db)):
-    tour = crud.get_tournament(db, tournament_id)
-    if not tour:
+async def get_standings(
+    tournament_id: int,
+    request: Request,
+    after_round: Optional[int] = Query(None, ge=1, description="Standings as they stood when this round was completed"),
+    include_ties: bool = Query(False, alias="ties", description="Add every tie cluster found in the standings"),
+    places: Optional[int] = Query(None, ge=1, description="Only tie clusters reaching into this many places per group"),
+    limit: Optional[int] = Query(None, ge=1, description="Return at most this many rows; not combined with ties"),
+    offset: int = Query(0, ge=0, description="Skip this many rows of the standings"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    _check_ties_unpaged(include_ties, limit, offset)
+    version = await async_crud.get_version(db, tournament_id)
+    if version is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
-    standings = crud.calculate_standings(db, tournament_id)
-    return StandingsResponse(standings=standings)
+
+    async def build():
+        if after_round is None:
+            standings = await async_crud.calculate_standings(db, tournament_id, limit, offset)
+        else:
+            standings = await async_crud.get_standings_after_round(db, tournament_id, after_round, limit, offset)
+            if not standings and not offset:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, f"No standings recorded after round {after_round}")
+        clusters = None
+        if include_ties:
+            clusters = ties.tie_clusters(standings, ties.TEAM_KEYS, "team_id", "group", places)
+        return StandingsResponse(standings=standings, tie_clusters=clusters)
+    kind = _response_kind("standings", after_round, include_ties, places, limit, offset)
+    return await cache.versioned_response(request, kind, tournament_id, version, build)
 
 @router.get("/{tournament_id}/best-players", response_model=BestPlayersResponse)
-def get_best_players(tournament_id: int, db: Session = Depends(get_db)):
+async def get_best_players(
+    tournament_id: int,
+    request: Request,
+    after_round: Optional[int] = Query(None, ge=1, description="Ranking as it stood when this round was completed"),
+    include_ties: bool = Query(False, alias="ties", description="Add every tie cluster found in the ranking"),
+    places: Optional[int] = Query(None, ge=1, description="Only tie clusters reaching into this many places"),
+    limit: Optional[int] = Query(None, ge=1, description="Return at most this many players; not combined with ties"),
+    offset: int = Query(0, ge=0, description="Skip this many players of the ranking"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    _check_ties_unpaged(include_ties, limit, offset)
+    version = await async_crud.get_version(db, tournament_id)
+    if version is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
+
+    async def build():
+        if after_round is None:
+            players = await async_crud.get_best_players(db, tournament_id, limit, offset)
+        else:
+            players = await async_crud.get_best_players_after_round(db, tournament_id, after_round, limit, offset)
+            if not players and not offset:
+                raise HTTPException(status.HTTP_404_NOT_FOUND, f"No best players recorded after round {after_round}")
+        clusters = None
+        if include_ties:
+            clusters = ties.tie_clusters(players, ties.PLAYER_KEYS, "player_id", places=places)
+        return BestPlayersResponse(players=players, tie_clusters=clusters)
+    kind = _response_kind("best-players", after_round, include_ties, places, limit, offset)
+    return await cache.versioned_response(request, kind, tournament_id, version, build)
+
+@router.get("/{tournament_id}/progression", response_model=ProgressionResponse)
+async def get_progression(tournament_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Every team's rank and points after each completed round, from the round snapshots"""
+    version = await async_crud.get_version(db, tournament_id)
+    if version is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
+
+    async def build():
+        return ProgressionResponse(**await async_crud.get_standings_progression(db, tournament_id))
+    return await cache.versioned_response(request, "progression", tournament_id, version, build)
+
+@router.get("/{tournament_id}/live")
+async def live_feed(tournament_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Server-sent events for result, match, round, standings and announcement changes of a tournament"""
+    version = await async_crud.get_version(db, tournament_id)
+    if version is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
+    await db.close()
+    return StreamingResponse(
+        live.stream(tournament_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/{tournament_id}/stats/verify")
+def verify_stats(tournament_id: int, repair: bool = False, db: Session = Depends(get_db),
+                 _: dict = Depends(get_current_user)):
+    """Check the incrementally maintained stats against a full recompute, optionally repairing them"""
+    recalc.flush(db, tournament_id)
     tour = crud.get_tournament(db, tournament_id)
     if not tour:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
-    stats = crud.get_best_players(db, tournament_id)
-    return BestPlayersResponse(players=stats)
+    return verify_tournament_stats(db, tournament_id, repair=repair)
 
 @router.post("/{tournament_id}/start")
 def start_tournament(tournament_id: int, db: Session = Depends(get_db), _: dict = Depends(get_current_user)):
     success = tournament.start_tournament(db, tournament_id)
     if not success:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cannot start tournament")
+    live.publish(tournament_id, "tournament_started", {})
     return {"message": "Tournament started successfully"}
 
 @router.post("/{tournament_id}/round/{round_number}/reschedule")
@@ -106,31 +270,38 @@ def reschedule_round(
 @router.post("/{tournament_id}/round/{round_number}/complete")
 def complete_round(tournament_id: int, round_number: int, db: Session = Depends(get_db), 
                   _: dict = Depends(get_current_user)):
+    recalc.flush(db, tournament_id)
     success = tournament.complete_round(db, tournament_id, round_number)
     if not success["completed"]:
         raise HTTPException(
             status.HTTP_500_INTERNAL_SERVER_ERROR, 
             success["reason"]
         )
+    _publish_progress(db, tournament_id, "round_completed", round_number=round_number)
     return {
         "message": f"Round {round_number} completed successfully",
     }
 
+def _publish_progress(db: Session, tournament_id: int, event: str, **data):
+    """Push a progress event with the tournament's resulting stage and round, then the standings version."""
+    if not live.broker.has_subscribers(tournament_id):
+        return
+    tour = crud.get_tournament(db, tournament_id)
+    live.publish(tournament_id, event, {**data, "current_round": tour.current_round, "stage": tour.stage.value})
+    live.publish_standings(db, tournament_id)
+
 @router.get("/{tournament_id}/round/{round_number}")
-def get_round_info(
+async def get_round_info(
     tournament_id: int, 
     round_number: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get round information including completion status"""
-    tour = crud.get_tournament(db, tournament_id)
-    if not tour:
+    version = await async_crud.get_version(db, tournament_id)
+    if version is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
     
-    round_obj = db.query(Round).filter(
-        Round.tournament_id == tournament_id,
-        Round.round_number == round_number
-    ).first()
+    round_obj = await async_crud.get_round(db, tournament_id, round_number)
     
     if not round_obj:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Round not found")
@@ -144,34 +315,36 @@ def get_round_info(
     }
 
 @router.get("/{tournament_id}/standings/check-tie")
-def check_standings_tie(
+async def check_standings_tie(
     tournament_id: int,
-    db: Session = Depends(get_db)
+    places: Optional[int] = Query(None, ge=1, description="Places per group to check; defaults to the knockout qualifiers or the podium"),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
-    tour=crud.get_tournament(db,tournament_id)
-    if not tour:
+    version = await async_crud.get_version(db, tournament_id)
+    if version is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
-    ties = tournament.check_standings_tie(db, tournament_id)
+    group_ties = await async_crud.check_standings_tie(db, tournament_id, places)
     return {
         "tournament_id": tournament_id,
-        "has_ties": bool(ties),
-        "ties": ties or {}
+        "has_ties": bool(group_ties),
+        "ties": group_ties or {}
     }
 
 
 @router.get("/{tournament_id}/best-players/check-tie")
-def check_best_players_tie(
+async def check_best_players_tie(
     tournament_id: int,
-    db: Session = Depends(get_db)
+    places: Optional[int] = Query(None, ge=1, description="Places to check; defaults to the best player only"),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
-    tour=crud.get_tournament(db,tournament_id)
-    if not tour:
+    version = await async_crud.get_version(db, tournament_id)
+    if version is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
-    ties = tournament.check_best_players_tie(db, tournament_id)
+    player_ties = await async_crud.check_best_players_tie(db, tournament_id, places)
     return {
             "tournament_id": tournament_id,
-        "has_ties": bool(ties),
-        "ties": ties or {}
+        "has_ties": bool(player_ties),
+        "ties": player_ties or {}
     }
     
 @router.post("/{tournament_id}/standings/tiebreaker")
@@ -188,8 +361,8 @@ def standings_tiebreaker(
     if not round.is_completed:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Group stage is not completed")
     
-    ties = tournament.check_standings_tie(db, tournament_id)
-    if not ties:
+    standings_ties = tournament.check_standings_tie(db, tournament_id)
+    if not standings_ties:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "No standings ties found")
     
     first_id = request.get("first_team_id")
@@ -205,7 +378,7 @@ def standings_tiebreaker(
     second_team_id = int(second_id)
     
     # Check if the teams are actually tied
-    group_ties = ties.get(int(group_key), {})
+    group_ties = standings_ties.get(int(group_key), {})
     if not group_ties:
         raise HTTPException(
             status.HTTP_400_BAD_REQUEST, 
@@ -229,7 +402,9 @@ def standings_tiebreaker(
     
     # Swap the manual tiebreaker values
     team1.manual_tb4, team2.manual_tb4 = team2.manual_tb4, team1.manual_tb4
+    cache.bump_version(db, tournament_id)
     db.commit()
+    live.publish_standings(db, tournament_id)
     return True
 
 @router.post("/{tournament_id}/best-player/tiebreaker")
@@ -245,8 +420,8 @@ def best_players_tiebreaker(
     round= db.query(Round).filter(Round.tournament_id==tournament_id,Round.round_number==tour.total_rounds).first()
     if not round.is_completed:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Tournament is not completed")
-    ties = tournament.check_best_players_tie(db, tournament_id)
-    if not ties:
+    player_ties = tournament.check_best_players_tie(db, tournament_id)
+    if not player_ties:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "No best players ties found")
     
     first_player_id = request.get("first_player_id")
@@ -255,11 +430,13 @@ def best_players_tiebreaker(
     if not first_player_id or not second_player_id :
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Missing required fields")
 
-    if first_player_id in ties and second_player_id in ties[first_player_id]:
+    if first_player_id in player_ties and second_player_id in player_ties[first_player_id]:
         player1 = db.query(Player).filter(Player.id == first_player_id).first()
         player2 = db.query(Player).filter(Player.id == second_player_id).first()
         player1.manual_tb3, player2.manual_tb3 = player2.manual_tb3, player1.manual_tb3
+        cache.bump_version(db, tournament_id)
         db.commit()
+        live.publish_standings(db, tournament_id)
         
     
     else:
@@ -275,17 +452,17 @@ def validate_standings(
     db: Session = Depends(get_db),
     _: dict = Depends(get_current_user)
 ):
+    recalc.flush(db, tournament_id)
     tour = crud.get_tournament(db, tournament_id)
     if not tour:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
     round=db.query(Round).filter(Round.tournament_id==tournament_id,Round.round_number==tour.total_group_stage_rounds).first()
     if round and round.is_completed:
         tour.group_standings_validated=True
-        if tour.format==TournamentFormat.group_knockout:
-            tour.stage=TournamentStage.semi_final
-            tournament.populate_knockout_matches(db,tournament_id)
-            tour.current_round+=1
+        if tour.format==TournamentFormat.group_knockout and tour.stage==TournamentStage.group:
+            tournament.advance_knockout(db, tour)
         tournament.complete_tournament(db,tournament_id)
+        _publish_progress(db, tournament_id, "standings_validated")
 
 @router.post("/{tournament_id}/best-players/validate")
 def validate_best_players(
@@ -293,10 +470,12 @@ def validate_best_players(
     db: Session = Depends(get_db),
     _: dict = Depends(get_current_user)
 ):
+    recalc.flush(db, tournament_id)
     tour = crud.get_tournament(db, tournament_id)
     if not tour:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Tournament not found")
     round=db.query(Round).filter(Round.tournament_id==tournament_id,Round.round_number==tour.total_rounds).first()
     if round and round.is_completed:
         tour.best_players_validated=True 
-    tournament.complete_tournament(db,tournament_id)       
+    tournament.complete_tournament(db,tournament_id)
+    _publish_progress(db, tournament_id, "best_players_validated")       
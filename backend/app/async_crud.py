@@ -0,0 +1,183 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from . import models, crud, schemas
+from .utilities import tournament
+from .utilities.pagination import Page, paginate
+
+# Read-only queries for the public endpoints. Relationships the response schemas serialize must be
+# loaded eagerly through loader_options, since lazy loads are not possible once an async query has returned.
+
+# Relationships each response model serializes, loaded with the rows so listings do not lazy-load one query per row
+RESPONSE_LOADERS = {
+    schemas.TournamentResponse: (selectinload(models.Tournament.announcements),),
+    schemas.MatchResponse: (selectinload(models.Match.games),),
+}
+
+def loader_options(response_model) -> tuple:
+    return RESPONSE_LOADERS.get(response_model, ())
+
+# -- Tournament --
+async def get_tournament(db: AsyncSession, tournament_id: int) -> Optional[models.Tournament]:
+    return await db.scalar(
+        select(models.Tournament)
+        .options(*loader_options(schemas.TournamentResponse))
+        .filter(models.Tournament.id == tournament_id)
+    )
+
+async def get_current_tournament(db: AsyncSession) -> Optional[models.Tournament]:
+    query = select(models.Tournament).options(*loader_options(schemas.TournamentResponse))
+    current = await db.scalar(query.filter(models.Tournament.is_current == True).limit(1))
+    if current:
+        return current
+    return await db.scalar(query.order_by(models.Tournament.created_at.desc()).limit(1))
+
+async def get_tournaments(db: AsyncSession, limit: int, cursor: Optional[str] = None, skip: int = 0,
+                          with_total: bool = False) -> Page:
+    """Keyset pages by id; skip is the old offset paging, kept for existing clients."""
+    query = select(models.Tournament).options(*loader_options(schemas.TournamentResponse))
+    return await paginate(db, query, (models.Tournament.id,), limit, cursor, offset=skip, with_total=with_total)
+
+async def get_version(db: AsyncSession, tournament_id: int) -> Optional[int]:
+    return await db.scalar(select(models.Tournament.version).filter(models.Tournament.id == tournament_id))
+
+async def get_total_rounds(db: AsyncSession, tournament_id: int) -> Optional[int]:
+    return await db.scalar(select(models.Tournament.total_rounds).filter(models.Tournament.id == tournament_id))
+
+async def get_round(db: AsyncSession, tournament_id: int, round_number: int) -> Optional[models.Round]:
+    return await db.scalar(select(models.Round).filter(
+        models.Round.tournament_id == tournament_id,
+        models.Round.round_number == round_number
+    ))
+
+# -- Team --
+async def get_team(db: AsyncSession, team_id: int) -> Optional[models.Team]:
+    return await db.get(models.Team, team_id)
+
+async def get_teams(db: AsyncSession, tournament_id: int, limit: Optional[int], cursor: Optional[str] = None,
+                    with_total: bool = False) -> Page:
+    query = select(models.Team).filter(models.Team.tournament_id == tournament_id)
+    return await paginate(db, query, (models.Team.id,), limit, cursor, with_total=with_total)
+
+# -- Player --
+async def get_player(db: AsyncSession, player_id: int) -> Optional[models.Player]:
+    return await db.get(models.Player, player_id)
+
+async def get_players(db: AsyncSession, limit: Optional[int], cursor: Optional[str] = None,
+                      team_ids: Optional[List[int]] = None, tournament_id: Optional[int] = None,
+                      with_total: bool = False) -> Page:
+    query = select(models.Player)
+    if team_ids:
+        query = query.filter(models.Player.team_id.in_(team_ids))
+    if tournament_id:
+        query = query.join(models.Team, models.Player.team_id == models.Team.id).filter(models.Team.tournament_id == tournament_id)
+    return await paginate(db, query, (models.Player.id,), limit, cursor, with_total=with_total)
+
+# -- Match --
+async def get_matches(db: AsyncSession, round_number: int, tournament_id: int, limit: Optional[int],
+                      cursor: Optional[str] = None, with_total: bool = False) -> Page:
+    query = select(models.Match).options(*loader_options(schemas.MatchResponse)).filter(
+        models.Match.tournament_id == tournament_id,
+        models.Match.round_number == round_number
+    )
+    return await paginate(db, query, (models.Match.id,), limit, cursor, with_total=with_total)
+
+# -- Standings and ties, sharing the sync ranking code --
+async def calculate_standings(db: AsyncSession, tournament_id: int, limit: Optional[int] = None, offset: int = 0):
+    return await db.run_sync(crud.calculate_standings, tournament_id, limit, offset)
+
+async def get_best_players(db: AsyncSession, tournament_id: int, limit: Optional[int] = None, offset: int = 0):
+    return await db.run_sync(crud.get_best_players, tournament_id, limit, offset)
+
+async def check_standings_tie(db: AsyncSession, tournament_id: int, places: Optional[int] = None) -> dict:
+    return await db.run_sync(tournament.check_standings_tie, tournament_id, places)
+
+async def check_best_players_tie(db: AsyncSession, tournament_id: int, places: Optional[int] = None) -> dict:
+    return await db.run_sync(tournament.check_best_players_tie, tournament_id, places)
+
+# -- Round snapshots --
+async def get_standings_after_round(db: AsyncSession, tournament_id: int, round_number: int,
+                                    limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+    """Standings rows as they stood when the round was completed, in ranking order."""
+    snapshot = models.TeamRoundSnapshot
+    result = await db.execute(
+        select(snapshot, models.Team.name)
+        .join(models.Team, snapshot.team_id == models.Team.id)
+        .filter(snapshot.tournament_id == tournament_id, snapshot.round_number == round_number)
+        .order_by(snapshot.group, snapshot.rank)
+        .offset(offset).limit(limit)
+    )
+    return [{
+        "team_id": row.team_id,
+        "team_name": name,
+        "group": row.group,
+        "match_points": row.match_points,
+        "game_points": row.game_points,
+        "sonneborn_berger": row.sonneborn_berger,
+        "manual_tb4": row.manual_tb4,
+        "wins": row.wins,
+        "losses": row.matches_played - row.wins - row.draws,
+        "draws": row.draws,
+        "matches_played": row.matches_played,
+    } for row, name in result.all()]
+
+async def get_best_players_after_round(db: AsyncSession, tournament_id: int, round_number: int,
+                                       limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+    snapshot = models.PlayerRoundSnapshot
+    result = await db.execute(
+        select(snapshot, models.Player.name)
+        .join(models.Player, snapshot.player_id == models.Player.id)
+        .filter(snapshot.tournament_id == tournament_id, snapshot.round_number == round_number)
+        .order_by(snapshot.rank)
+        .offset(offset).limit(limit)
+    )
+    return [{
+        "player_id": row.player_id,
+        "player_name": name,
+        "points": row.points,
+        "wins": row.wins,
+        "tb3": row.tb3,
+        "games_played": row.games_played,
+        "draws": row.draws,
+        "losses": row.games_played - row.wins - row.draws,
+    } for row, name in result.all()]
+
+async def get_standings_progression(db: AsyncSession, tournament_id: int) -> dict:
+    """Each team's rank and points after every completed round, ordered by the latest standings."""
+    snapshot = models.TeamRoundSnapshot
+    result = await db.execute(
+        select(snapshot.team_id, models.Team.name, snapshot.round_number, snapshot.group, snapshot.rank,
+               snapshot.match_points, snapshot.game_points)
+        .join(models.Team, snapshot.team_id == models.Team.id)
+        .filter(snapshot.tournament_id == tournament_id)
+        .order_by(snapshot.round_number)
+    )
+    rounds = []
+    teams = {}
+    for row in result.all():
+        if not rounds or rounds[-1] != row.round_number:
+            rounds.append(row.round_number)
+        team = teams.setdefault(row.team_id, {
+            "team_id": row.team_id, "team_name": row.name, "group": row.group,
+            "rank": [], "match_points": [], "game_points": [],
+        })
+        team["group"] = row.group
+        team["rank"].append(row.rank)
+        team["match_points"].append(row.match_points)
+        team["game_points"].append(row.game_points)
+    return {
+        "rounds": rounds,
+        "teams": sorted(teams.values(), key=lambda t: (t["group"], t["rank"][-1])),
+    }
+
+# -- Announcement --
+async def get_tournament_announcements(db: AsyncSession, tournament_id: int, limit: Optional[int],
+                                       cursor: Optional[str] = None, with_total: bool = False) -> Page:
+    """
+    Pinned first, then newest first. Ids follow creation order, so they stand in for created_at in
+    the cursor: unique, and compared the same way on every database.
+    """
+    query = select(models.Announcement).filter(models.Announcement.tournament_id == tournament_id)
+    keys = (models.Announcement.is_pinned, models.Announcement.id)
+    return await paginate(db, query, keys, limit, cursor, descending=True, with_total=with_total)
@@ -4,21 +4,13 @@ from sqlalchemy import and_
 from typing import List, Optional
 from . import models, schemas
 from .utilities.tournament import create_tournament_structure
+from .utilities.cache import bump_version
 from sqlalchemy.orm import joinedload
 
 # -- Tournament CRUD --
 def get_tournament(db: Session, tournament_id: int) -> Optional[models.Tournament]:
     return db.query(models.Tournament).filter(models.Tournament.id == tournament_id).first()
 
-def get_current_tournament(db: Session) -> Optional[models.Tournament]:
-    current = db.query(models.Tournament).filter(models.Tournament.is_current == True).first()
-    if current:
-        return current
-    return db.query(models.Tournament).order_by(models.Tournament.created_at.desc()).first()
-
-def get_tournaments(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Tournament).order_by(models.Tournament.id).offset(skip).limit(limit).all()
-
 def create_tournament(db: Session, tournament: schemas.TournamentCreate) -> models.Tournament:
     return create_tournament_structure(db, tournament)
 
@@ -75,6 +67,7 @@ def update_team(db: Session, team_id: int, team_update: schemas.TeamUpdate) -> O
 
     for field, value in data.items():
         setattr(team, field, value)
+    bump_version(db, team.tournament_id)
     db.commit()
     db.refresh(team)
     return team
@@ -106,6 +99,7 @@ def create_player(db: Session, player: schemas.PlayerCreate) -> models.Player:
         raise ValueError("Player name already exists in the same team")
     db_player = models.Player(**data)
     db.add(db_player)
+    bump_version(db, team.tournament_id)
     db.commit()
     db.refresh(db_player)
     return db_player
@@ -127,6 +121,7 @@ def update_player(db: Session, player_id: int, player_update: schemas.PlayerUpda
 
     for field, value in data.items():
         setattr(player, field, value)
+    bump_version(db, player.team.tournament_id)
     db.commit()
     db.refresh(player)
     return player
@@ -135,6 +130,7 @@ def delete_player(db: Session, player_id: int) -> bool:
     player = get_player(db, player_id)
     if not player:
         return False
+    bump_version(db, player.team.tournament_id)
     db.delete(player)
     db.commit()
     return True
@@ -143,60 +139,54 @@ def delete_player(db: Session, player_id: int) -> bool:
 def get_match(db: Session, match_id: int) -> Optional[models.Match]:
     return db.query(models.Match).filter(models.Match.id == match_id).first()
 
-def get_matches(db: Session, round_number: int, tournament_id: int) -> List[models.Match]:
-    matches = db.query(models.Match).filter(
-        models.Match.tournament_id == tournament_id,
-        models.Match.round_number == round_number
-    ).order_by(models.Match.id).all()
-    return matches
-
-def calculate_standings(db: Session, tournament_id: int):
-    teams = db.query(models.Team).filter(
+# Rankings sorted in SQL, matching score_matrix.standings_order and best_players_order; unset manual
+# tiebreaks sort last ("IS NULL" first, as it can be indexed on every backend, unlike NULLS LAST).
+# The standings follow ix_teams_standings_order exactly, so a page reads only its own rows. Players
+# carry no tournament id to index on, so a tournament's players are sorted; there are few of them.
+STANDINGS_ORDER = (
+    models.Team.group, models.Team.match_points.desc(), models.Team.game_points.desc(),
+    models.Team.sonneborn_berger.desc(), models.Team.manual_tb4.is_(None), models.Team.manual_tb4, models.Team.id,
+)
+BEST_PLAYERS_ORDER = (
+    models.Player.points.desc(), models.Player.wins.desc(), models.Player.manual_tb3.is_(None),
+    models.Player.manual_tb3, models.Player.id,
+)
+
+def calculate_standings(db: Session, tournament_id: int, limit: Optional[int] = None, offset: int = 0):
+    query = db.query(
+        models.Team.id.label("team_id"),
+        models.Team.name.label("team_name"),
+        models.Team.group,
+        models.Team.match_points,
+        models.Team.game_points,
+        models.Team.sonneborn_berger,
+        models.Team.manual_tb4,
+        models.Team.wins,
+        models.Team.losses,
+        models.Team.draws,
+        models.Team.matches_played,
+    ).filter(
         models.Team.tournament_id == tournament_id
-    ).order_by(models.Team.id).all()
-    
-    standings = []
-    for team in teams:
-        standings.append({
-            "team_id": team.id,
-            "team_name": team.name,
-            "group":team.group,
-            "match_points": team.match_points,
-            "game_points": team.game_points,
-            "sonneborn_berger": team.sonneborn_berger,
-            "manual_tb4": team.manual_tb4,
-            "wins": team.wins,
-            "losses": team.losses,
-            "draws": team.draws,
-            "matches_played": team.matches_played
-        })
-    standings.sort(key=lambda x: (x["group"], -x["match_points"], -x["game_points"], -x["sonneborn_berger"], x["manual_tb4"]))
-
-    return standings
+    ).order_by(*STANDINGS_ORDER).offset(offset).limit(limit)
+    return [row._asdict() for row in query.all()]
  
-def get_best_players(db: Session, tournament_id: int):
+def get_best_players(db: Session, tournament_id: int, limit: Optional[int] = None, offset: int = 0):
     """Get best players using pre-calculated player statistics"""
-    players = db.query(models.Player).join(
+    query = db.query(
+        models.Player.id.label("player_id"),
+        models.Player.name.label("player_name"),
+        models.Player.points,
+        models.Player.wins,
+        models.Player.manual_tb3.label("tb3"),
+        models.Player.games_played,
+        models.Player.draws,
+        models.Player.losses,
+    ).join(
         models.Team, models.Player.team_id == models.Team.id
     ).filter(
         models.Team.tournament_id == tournament_id
-    ).order_by(models.Player.id).all()
-    
-    player_stats = []
-    for player in players:
-        player_stats.append({
-            "player_id": player.id,
-            "player_name": player.name,
-            "points": player.points,
-            "wins": player.wins,
-            "tb3": player.manual_tb3,
-            "games_played": player.games_played,
-            "draws": player.draws,
-            "losses": player.losses,
-        })
-    player_stats.sort(key=lambda x: (-x["points"], -x["wins"], x["tb3"]))
-    
-    return player_stats
+    ).order_by(*BEST_PLAYERS_ORDER).offset(offset).limit(limit)
+    return [row._asdict() for row in query.all()]
 
 # -- Announcement CRUD --
 def get_tournament_announcements(db: Session, tournament_id: int) -> List[models.Announcement]:
@@ -204,7 +194,7 @@ def get_tournament_announcements(db: Session, tournament_id: int) -> List[models
         models.Announcement.tournament_id == tournament_id
     ).order_by(
         models.Announcement.is_pinned.desc(),
-        models.Announcement.created_at.desc()
+        models.Announcement.id.desc()
     ).all()
 
 def get_announcement(db: Session, announcement_id: int) -> Optional[models.Announcement]:
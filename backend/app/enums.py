@@ -2,6 +2,7 @@ from enum import Enum as PyEnum
 class TournamentStage(PyEnum):
     not_yet_started = "not_yet_started"
     group = "group"
+    knockout = "knockout"
     semi_final = "semi_final"
     final = "final"
     completed = "completed"
@@ -25,6 +26,7 @@ class Tiebreaker(PyEnum):
     black_win = "black_win"
 class MatchLabel(PyEnum):
     group="group"
+    knockout="knockout"
     SF1="SF1"
     SF2="SF2"
     Final="Final"
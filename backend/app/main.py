@@ -1,14 +1,19 @@
 ### backend/app/main.py
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 import os, logging
 from contextlib import asynccontextmanager
-from .database import engine, Base
-from .api import tournaments, teams, players, matches, auth, announcements
+from .database import engine, async_engine, Base, POOL_OPTIONS
+from .api import tournaments, teams, players, matches, auth, announcements, system
+from .utilities import recalc, metrics
+from .utilities.compression import CompressionMiddleware
+from .utilities.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from .utilities.pool import log_pool_stats
+from .utilities.static import StaticAssets
+from .utilities.auth import get_metrics_reader
 from dotenv import load_dotenv; load_dotenv()
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,14 +29,20 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting up")
     Base.metadata.create_all(bind=engine)
     logger.info("✅ Tables ready")
+    logger.info("DB pool settings: %s", POOL_OPTIONS)
+    static_assets.load()
     yield
     # Shutdown
+    recalc.shutdown()
+    log_pool_stats()
+    await async_engine.dispose()
     logger.info("🛑 Shutting down")
 
 app = FastAPI(
     title="Chess Tournament Management System",
     version=API_VERSION,
     docs_url="/docs" if DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -41,9 +52,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 if not DEBUG:
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=ALLOWED_HOSTS)
+app.add_middleware(CompressionMiddleware)
+# Outermost, so latency and response size cover every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+metrics.instrument_engine(async_engine.sync_engine)
 
 app.include_router(auth.router)
 app.include_router(tournaments.router)
@@ -51,10 +68,13 @@ app.include_router(teams.router)
 app.include_router(players.router)
 app.include_router(matches.router)
 app.include_router(announcements.router)
+app.include_router(system.router)
 
-frontend_path = os.path.join(os.path.dirname(__file__), "../../frontend/dist")
-app.mount("/", StaticFiles(directory=frontend_path, html=True), name="static")
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(_: dict = Depends(get_metrics_reader)):
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
-@app.get("/{full_path:path}")
-def spa_fallback():
-    return FileResponse(os.path.join(frontend_path, "index.html"))
\ No newline at end of file
+frontend_path = os.path.join(os.path.dirname(__file__), "../../frontend/dist")
+# Loaded in lifespan; also answers client-side routes with index.html
+static_assets = StaticAssets(frontend_path)
+app.mount("/", static_assets, name="static")
\ No newline at end of file
@@ -1,5 +1,5 @@
 ### backend/app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -24,11 +24,16 @@ class Tournament(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     group_standings_validated = Column(Boolean, default=False)   
     best_players_validated = Column(Boolean, default=False)  
+    knockout_size = Column(Integer, nullable=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    stats_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     teams = relationship("Team", back_populates="tournament", cascade="all, delete-orphan", order_by="Team.id")
     matches = relationship("Match", back_populates="tournament", cascade="all, delete-orphan", order_by="Match.id")
     rounds = relationship("Round", back_populates="tournament", cascade="all, delete-orphan")
     announcements = relationship("Announcement", back_populates="tournament", cascade="all, delete-orphan")
+    team_snapshots = relationship("TeamRoundSnapshot", cascade="all, delete-orphan")
+    player_snapshots = relationship("PlayerRoundSnapshot", cascade="all, delete-orphan")
 
 class Team(Base):
     __tablename__ = "teams"
@@ -55,6 +60,13 @@ class Team(Base):
     white_matches = relationship("Match", back_populates="white_team", foreign_keys="Match.white_team_id", cascade="all, delete-orphan", order_by="Match.id")
     black_matches = relationship("Match", back_populates="black_team", foreign_keys="Match.black_team_id", cascade="all, delete-orphan", order_by="Match.id")
 
+    __table_args__ = (
+        Index("ix_teams_tournament_id", "tournament_id"),
+        # Standings order within a tournament, column for column (see crud.STANDINGS_ORDER)
+        Index("ix_teams_standings_order", tournament_id, group, match_points.desc(), game_points.desc(),
+              sonneborn_berger.desc(), manual_tb4.is_(None), manual_tb4, id),
+    )
+
 class Player(Base):
     __tablename__ = "players"
     id = Column(Integer, primary_key=True, index=True)
@@ -73,6 +85,10 @@ class Player(Base):
 
     team = relationship("Team", back_populates="players", foreign_keys=[team_id])
 
+    __table_args__ = (
+        Index("ix_players_team_id", "team_id"),
+    )
+
 class Round(Base):
     __tablename__ = "rounds"
     id = Column(Integer, primary_key=True, index=True)
@@ -86,6 +102,10 @@ class Round(Base):
     tournament = relationship("Tournament", back_populates="rounds")
     matches = relationship("Match", back_populates="round", cascade="all, delete-orphan", order_by="Match.id")
 
+    __table_args__ = (
+        Index("ix_rounds_tournament_id_round_number", "tournament_id", "round_number"),
+    )
+
 class Match(Base):
     __tablename__ = "matches"
     id = Column(Integer, primary_key=True, index=True)
@@ -94,6 +114,7 @@ class Match(Base):
     label = Column(SQLEnum(MatchLabel), nullable=False, default=MatchLabel.group)
     round_number = Column(Integer)
     group = Column(Integer, default= 1)
+    bracket_slot = Column(Integer, nullable=True)
     white_team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
     black_team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
     white_score = Column(Float, default=0.0)
@@ -111,6 +132,14 @@ class Match(Base):
     games = relationship("Game", back_populates="match", cascade="all, delete-orphan", order_by="Game.id")
     white_team = relationship("Team", foreign_keys=[white_team_id], back_populates="white_matches")
     black_team = relationship("Team", foreign_keys=[black_team_id], back_populates="black_matches")
+
+    __table_args__ = (
+        Index("ix_matches_tournament_id_round_number", "tournament_id", "round_number"),
+        Index("ix_matches_tournament_id_white_team", "tournament_id", "white_team_id", "is_completed", "label"),
+        Index("ix_matches_tournament_id_black_team", "tournament_id", "black_team_id", "is_completed", "label"),
+        Index("ix_matches_tournament_id_bracket_slot", "tournament_id", "bracket_slot"),
+        Index("ix_matches_round_id", "round_id"),
+    )
     
 class Game(Base):
     __tablename__ = "games"
@@ -130,6 +159,41 @@ class Game(Base):
     white_player = relationship("Player", foreign_keys=[white_player_id])
     black_player = relationship("Player", foreign_keys=[black_player_id])
 
+    __table_args__ = (
+        Index("ix_games_match_id_board_number", "match_id", "board_number"),
+        Index("ix_games_white_player_id", "white_player_id"),
+        Index("ix_games_black_player_id", "black_player_id"),
+    )
+
+class TeamRoundSnapshot(Base):
+    """A team's standings row as it stood when a round was completed."""
+    __tablename__ = "team_round_snapshots"
+    tournament_id = Column(Integer, ForeignKey("tournaments.id"), primary_key=True)
+    round_number = Column(Integer, primary_key=True)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    group = Column(Integer, nullable=False)
+    rank = Column(Integer, nullable=False)
+    matches_played = Column(Integer, nullable=False)
+    wins = Column(Integer, nullable=False)
+    draws = Column(Integer, nullable=False)
+    match_points = Column(Float, nullable=False)
+    game_points = Column(Float, nullable=False)
+    sonneborn_berger = Column(Float, nullable=False)
+    manual_tb4 = Column(Float, nullable=True)
+
+class PlayerRoundSnapshot(Base):
+    """A player's best-players row as it stood when a round was completed."""
+    __tablename__ = "player_round_snapshots"
+    tournament_id = Column(Integer, ForeignKey("tournaments.id"), primary_key=True)
+    round_number = Column(Integer, primary_key=True)
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, nullable=False)
+    games_played = Column(Integer, nullable=False)
+    wins = Column(Integer, nullable=False)
+    draws = Column(Integer, nullable=False)
+    points = Column(Float, nullable=False)
+    tb3 = Column(Float, nullable=True)
+
 class Announcement(Base):
     __tablename__ = "announcements"
     id = Column(Integer, primary_key=True, index=True)
@@ -141,3 +205,8 @@ class Announcement(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     tournament = relationship("Tournament", back_populates="announcements")
+
+    __table_args__ = (
+        # Listing order: pinned first, then newest first by id, which follows created_at
+        Index("ix_announcements_tournament_id_pinned_id", "tournament_id", "is_pinned", "id"),
+    )
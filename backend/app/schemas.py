@@ -15,6 +15,12 @@ class TournamentBase(BaseModel):
 
 class TournamentCreate(TournamentBase):
     team_names: List[str]
+    # Swiss only; defaults to ceil(log2(teams))
+    total_rounds: Optional[int] = None
+    # Round robin and group + knockout; defaults to 1 and 2 groups
+    group_count: Optional[int] = None
+    # Group + knockout only; a power of two, defaults to 4
+    knockout_size: Optional[int] = None
 
 class TournamentUpdate(BaseModel):
     name: Optional[str] = None
@@ -31,6 +37,7 @@ class TournamentResponse(TournamentBase):
     stage: TournamentStage
     group_standings_validated: bool
     best_players_validated: bool
+    knockout_size: Optional[int] = None
     announcements: List['AnnouncementResponse'] = []
     class Config:
         from_attributes = True
@@ -82,6 +89,26 @@ class GameResponse(BaseModel):
 
 class ResultUpdate(BaseModel):
     result:MatchResult
+
+class BatchResultEntry(BaseModel):
+    match_id: int
+    board_number: int
+    result: MatchResult
+
+class BatchResultRequest(BaseModel):
+    results: List[BatchResultEntry]
+
+class BatchResultStatus(BaseModel):
+    match_id: int
+    board_number: int
+    status: str
+    detail: Optional[str] = None
+
+class BatchResultResponse(BaseModel):
+    applied: int
+    rejected: int
+    results: List[BatchResultStatus]
+
 class MatchResponse(BaseModel):
     id: int
     round_number: int
@@ -96,6 +123,7 @@ class MatchResponse(BaseModel):
     games: List[GameResponse]
     tiebreaker:Tiebreaker
     group: int
+    bracket_slot: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -115,8 +143,15 @@ class StandingsEntry(BaseModel):
     class Config:
         from_attributes = True
 
+class TieCluster(BaseModel):
+    # Rows level on every ranking key; rank is the cluster's first place within its group
+    group: Optional[int] = None
+    rank: int
+    ids: List[int]
+
 class StandingsResponse(BaseModel):
     standings: List[StandingsEntry]
+    tie_clusters: Optional[List[TieCluster]] = None
 
 class BestPlayerEntry(BaseModel):
     player_id: int
@@ -130,6 +165,20 @@ class BestPlayerEntry(BaseModel):
     
 class BestPlayersResponse(BaseModel):
     players: List[BestPlayerEntry]
+    tie_clusters: Optional[List[TieCluster]] = None
+
+class TeamProgression(BaseModel):
+    team_id: int
+    team_name: str
+    group: int
+    # One entry per completed round, in round order
+    rank: List[int]
+    match_points: List[float]
+    game_points: List[float]
+
+class ProgressionResponse(BaseModel):
+    rounds: List[int]
+    teams: List[TeamProgression]
 
 class RoundRescheduleRequest(BaseModel):
     start_date: datetime
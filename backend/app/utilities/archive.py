@@ -0,0 +1,269 @@
+"""
+Export a tournament as line-delimited JSON, or import one back under new ids.
+
+    python -m app.utilities.archive export 3 -o spring-open.ndjson
+    python -m app.utilities.archive import spring-open.ndjson
+
+The first line is a header; every other line is one row, {"type": <table>, ...columns}, tables in
+the order of ARCHIVE_TABLES so each row only refers to rows before it.
+"""
+import argparse
+import enum
+import json
+import sys
+from datetime import datetime
+from typing import IO, Dict, Iterable, Iterator, List
+from sqlalchemy import DateTime, Enum, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..models import (Announcement, Game, Match, Player, PlayerRoundSnapshot, Round, Team, TeamRoundSnapshot,
+                      Tournament)
+
+FORMAT = "chesshub-tournament"
+FORMAT_VERSION = 1
+MEDIA_TYPE = "application/x-ndjson"
+# Rows fetched per round trip on export and inserted per statement on import
+BATCH_SIZE = 1000
+
+ARCHIVE_TABLES = [Tournament, Team, Player, Round, Match, Game, Announcement, TeamRoundSnapshot, PlayerRoundSnapshot]
+_by_name = {model.__tablename__: model for model in ARCHIVE_TABLES}
+
+# Team.captain_id points forward at players, so it is filled in once the players exist
+DEFERRED = {(Team.__tablename__, "captain_id")}
+
+def _rows_of(model, tournament_id: int):
+    table = model.__table__
+    if model is Tournament:
+        condition = table.c.id == tournament_id
+    elif model is Player:
+        condition = table.c.team_id.in_(select(Team.id).where(Team.tournament_id == tournament_id))
+    elif model is Game:
+        condition = table.c.match_id.in_(select(Match.id).where(Match.tournament_id == tournament_id))
+    else:
+        condition = table.c.tournament_id == tournament_id
+    order = table.primary_key.columns
+    return select(table).where(condition).order_by(*order)
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        # Enums are stored by name
+        return value.name
+    return value
+
+def _read_snapshot(db: Session):
+    """
+    Start the session's transaction on a single snapshot, so every table is read as of the same moment:
+    REPEATABLE READ (read only on PostgreSQL), or an explicit transaction on SQLite, whose driver
+    otherwise runs each SELECT on its own.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+    elif dialect == "mysql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    elif dialect == "sqlite":
+        db.connection().exec_driver_sql("BEGIN")
+
+def export_lines(db: Session, tournament_id: int) -> Iterator[bytes]:
+    """
+    The archive in chunks of whole lines, one chunk per BATCH_SIZE rows read through a server-side
+    cursor, so memory stays flat however large the tournament is. All tables are read in one
+    transaction on one snapshot, so `db` must not have started a transaction yet.
+    """
+    _read_snapshot(db)
+    if db.get(Tournament, tournament_id) is None:
+        raise ValueError(f"Tournament {tournament_id} not found")
+    header = {"format": FORMAT, "version": FORMAT_VERSION, "exported_at": datetime.now().isoformat(),
+              "tables": [model.__tablename__ for model in ARCHIVE_TABLES]}
+    yield json.dumps(header, separators=(",", ":")).encode() + b"\n"
+    for model in ARCHIVE_TABLES:
+        name = model.__tablename__
+        result = db.execute(_rows_of(model, tournament_id).execution_options(yield_per=BATCH_SIZE))
+        for partition in result.partitions():
+            yield b"".join(
+                json.dumps({"type": name, **{k: _encode(v) for k, v in row._mapping.items()}},
+                           separators=(",", ":")).encode() + b"\n"
+                for row in partition
+            )
+
+class _Importer:
+    """Bulk-inserts archive rows table by table, mapping every exported id to the one it got here."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.ids: Dict[str, Dict[int, int]] = {model.__tablename__: {} for model in ARCHIVE_TABLES}
+        # (model, exported row id, column, referenced table, exported value) for DEFERRED columns
+        self.deferred: List[tuple] = []
+        self.counts: Dict[str, int] = {}
+        self._model = None
+        self._old_ids: List[int] = []
+        self._batch: List[dict] = []
+
+    def _decode(self, model, record: dict) -> dict:
+        table = model.__table__
+        row = {}
+        for key, value in record.items():
+            if key == "type":
+                continue
+            column = table.columns.get(key)
+            if column is None:
+                raise ValueError(f"Unknown column {model.__tablename__}.{key}")
+            if value is not None and isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(column.type, Enum) and column.type.enum_class is not None:
+                value = column.type.enum_class[value]
+            for fk in column.foreign_keys:
+                target = fk.column.table.name
+                if value is None:
+                    continue
+                if (model.__tablename__, key) in DEFERRED:
+                    self.deferred.append((model, record.get("id"), key, target, value))
+                    value = None
+                elif value in self.ids[target]:
+                    value = self.ids[target][value]
+                else:
+                    raise ValueError(f"{model.__tablename__}.{key} refers to {target} {value}, which is not in the archive")
+            row[key] = value
+        return row
+
+    def add(self, record: dict):
+        model = _by_name.get(record.get("type"))
+        if model is None:
+            raise ValueError(f"Unknown record type {record.get('type')!r}")
+        if model is not self._model:
+            self.flush()
+            if self._model is not None and ARCHIVE_TABLES.index(model) < ARCHIVE_TABLES.index(self._model):
+                raise ValueError(f"{model.__tablename__} rows must come before {self._model.__tablename__} rows")
+            self._model = model
+        if model is Tournament and (self.ids["tournaments"] or self._batch):
+            raise ValueError("An archive holds a single tournament")
+        row = self._decode(model, record)
+        if model is Tournament:
+            # Never take over as the current tournament of the environment it is imported into
+            row["is_current"] = False
+        if "id" in model.__table__.columns:
+            if row.get("id") is None:
+                raise ValueError(f"A {model.__tablename__} row has no id")
+            self._old_ids.append(row.pop("id"))
+        self._batch.append(row)
+        if len(self._batch) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        name, table = self._model.__tablename__, self._model.__table__
+        if "id" in table.columns:
+            new_ids = self.db.scalars(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True), self._batch
+            ).all()
+            self.ids[name].update(zip(self._old_ids, new_ids))
+        else:
+            self.db.execute(insert(table), self._batch)
+        self.counts[name] = self.counts.get(name, 0) + len(self._batch)
+        self._batch, self._old_ids = [], []
+
+    def finish(self) -> int:
+        self.flush()
+        if not self.ids["tournaments"]:
+            raise ValueError("The archive holds no tournament")
+        for model, old_id, key, target, value in self.deferred:
+            if value not in self.ids[target]:
+                raise ValueError(f"{model.__tablename__}.{key} refers to {target} {value}, which is not in the archive")
+            table = model.__table__
+            self.db.execute(update(table).where(table.c.id == self.ids[model.__tablename__][old_id])
+                            .values({key: self.ids[target][value]}))
+        return next(iter(self.ids["tournaments"].values()))
+
+def _lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Single lines from chunks that may hold several lines or stop partway through one."""
+    pending = b""
+    for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        yield from lines
+    if pending:
+        yield pending
+
+def _records(chunks: Iterable[bytes]) -> Iterator[dict]:
+    lines = _lines(chunks)
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise ValueError("Not a tournament archive")
+    if not isinstance(header, dict) or header.get("format") != FORMAT:
+        raise ValueError("Not a tournament archive")
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive version {header.get('version')}")
+    for number, line in enumerate(lines, start=2):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {number} is not valid JSON")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number} is not a record")
+        yield record
+
+def import_lines(db: Session, lines: Iterable[bytes]) -> dict:
+    """
+    Load an archive as a new tournament, from the lines of a file or the chunks export_lines yields,
+    in one transaction: every row gets a new id and every reference is rewritten to match. Raises
+    ValueError, leaving nothing behind, if the archive is malformed or refers to rows it does not contain.
+    """
+    importer = _Importer(db)
+    try:
+        for record in _records(lines):
+            importer.add(record)
+        tournament_id = importer.finish()
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise ValueError(f"The archive does not fit the schema: {e.orig}")
+    except Exception:
+        db.rollback()
+        raise
+    return {"tournament_id": tournament_id, "rows": importer.counts}
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m app.utilities.archive", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write a tournament archive")
+    export.add_argument("tournament_id", type=int)
+    export.add_argument("-o", "--output", help="defaults to stdout")
+    load = commands.add_parser("import", help="load an archive as a new tournament")
+    load.add_argument("input", nargs="?", help="defaults to stdin")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.command == "export":
+            out: IO[bytes] = open(args.output, "wb") if args.output else sys.stdout.buffer
+            try:
+                for chunk in export_lines(db, args.tournament_id):
+                    out.write(chunk)
+            finally:
+                if args.output:
+                    out.close()
+        else:
+            source: IO[bytes] = open(args.input, "rb") if args.input else sys.stdin.buffer
+            try:
+                summary = import_lines(db, source)
+            finally:
+                if args.input:
+                    source.close()
+            print(json.dumps(summary), file=sys.stderr)
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,13 @@
 from fastapi import Depends, HTTPException
 import jwt
 import os
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta 
+from typing import Dict, Optional
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jwt import ExpiredSignatureError, InvalidTokenError
 
@@ -11,6 +17,98 @@ bearer_scheme = HTTPBearer(auto_error=True)
 JWT_SECRET = os.getenv("JWT_SECRET", "supersecretkey")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRY_MINUTES = 60
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+# Long-lived bearer token for a Prometheus scraper, accepted at /metrics only; unset, only admins can read it
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+class TokenCache:
+    """
+    Payloads of tokens that already passed verification, keyed on the token's SHA-256 and kept
+    until the token's own exp, so an arbiter submitting many results pays for the signature check once.
+    Least recently used entries are dropped beyond max_size. Each entry carries the secret generation
+    it was verified under, and an entry from an older generation is never stored or returned.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, expires_at, generation = entry
+            if generation != self.generation:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            if expires_at <= time.time():
+                # Left for jwt.decode to reject as expired
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: bytes, payload: dict, generation: int):
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.max_size <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                # Verified under a secret rotated out while the decode ran
+                return
+            self._entries[key] = (payload, expires_at, generation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry and refuse any put still carrying the old generation."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+def rotate_secret(secret: str):
+    """Sign and verify with a new secret from now on; tokens verified under the old one must verify again."""
+    global JWT_SECRET
+    # The secret changes before the generation does, and decode_token reads them in the opposite
+    # order, so a decode that saw the new generation also sees the new secret
+    JWT_SECRET = secret
+    token_cache.invalidate()
 
 def create_token(user_id: str):
     now = datetime.now()
@@ -22,8 +120,15 @@ def create_token(user_id: str):
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 def decode_token(token: str) -> dict:
+    key = token_cache.key(token)
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    generation = token_cache.generation
     try:
-        return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        token_cache.put(key, payload, generation)
+        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -38,3 +143,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
         raise HTTPException(status_code=401, detail="Token expired")
     except InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+async def get_metrics_reader(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    if METRICS_TOKEN and hmac.compare_digest(credentials.credentials.encode(), METRICS_TOKEN.encode()):
+        return {"user": "metrics"}
+    return await get_current_user(credentials)
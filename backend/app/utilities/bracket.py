@@ -0,0 +1,148 @@
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from ..enums import MatchLabel, TournamentStage
+from .score_matrix import UNSET_TIEBREAK
+
+GROUP = "group"
+BEST = "best"
+WINNER = "winner"
+LOSER = "loser"
+
+class Feeder(NamedTuple):
+    """
+    Where the team in a bracket slot comes from:
+    (GROUP, group, rank), (BEST, n, rank) for the n-th best team placed rank across all groups,
+    or (WINNER / LOSER, match slot, 0) of an earlier bracket match.
+    """
+    kind: str
+    ref: int
+    rank: int = 0
+
+class BracketMatch(NamedTuple):
+    slot: int
+    round: int
+    label: MatchLabel
+    white: Feeder
+    black: Feeder
+
+def seed_positions(size: int) -> List[int]:
+    """Seeds 1..size in bracket order, so consecutive pairs meet first and seeds 1 and 2 only in the final."""
+    order = [1]
+    while len(order) < size:
+        order = [seed for s in order for seed in (s, 2 * len(order) + 1 - s)]
+    return order
+
+class Bracket:
+    """
+    Single-elimination bracket for `size` qualifiers from `group_count` groups, with a third-place match.
+
+    Every group sends its top size // group_count teams; any remaining places go to the best teams
+    of the next placing across groups. Qualifiers are seeded placing by placing (all group winners,
+    then all runners-up, ...), so with two groups the first round is A1-B2 and B1-A2.
+    Slots number the matches round by round; the final is slot size - 1 and the third-place match slot size.
+    """
+
+    def __init__(self, size: int, group_count: int):
+        if size < 2 or size & (size - 1):
+            raise ValueError("The knockout stage needs a power of two qualifiers, at least 2")
+        if group_count < 1 or size < group_count:
+            raise ValueError(f"A knockout of {size} cannot take the winners of {group_count} groups")
+        self.size = size
+        self.group_count = group_count
+        self.rounds = size.bit_length() - 1
+        self.per_group, self.extra = divmod(size, group_count)
+
+        seeds = [Feeder(GROUP, group, rank) for rank in range(1, self.per_group + 1) for group in range(1, group_count + 1)]
+        seeds += [Feeder(BEST, n, self.per_group + 1) for n in range(1, self.extra + 1)]
+        order = seed_positions(size)
+        entrants = [seeds[seed - 1] for seed in order]
+
+        self.matches: List[BracketMatch] = []
+        self._rounds: Dict[int, List[BracketMatch]] = {}
+        slot = 0
+        for round_num in range(1, self.rounds + 1):
+            labels = self._labels(round_num)
+            matches = []
+            for i in range(0, len(entrants), 2):
+                slot += 1
+                matches.append(BracketMatch(slot, round_num, labels[i // 2], entrants[i], entrants[i + 1]))
+            if round_num == self.rounds and self.rounds > 1:
+                semis = self._rounds[round_num - 1]
+                matches.append(BracketMatch(size, round_num, MatchLabel.Place3rd,
+                                            Feeder(LOSER, semis[0].slot), Feeder(LOSER, semis[1].slot)))
+            self._rounds[round_num] = matches
+            self.matches += matches
+            entrants = [Feeder(WINNER, match.slot) for match in matches[:len(entrants) // 2]]
+        self.by_slot = {match.slot: match for match in self.matches}
+
+    def _labels(self, round_num: int) -> List[MatchLabel]:
+        if round_num == self.rounds:
+            return [MatchLabel.Final]
+        if round_num == self.rounds - 1:
+            return [MatchLabel.SF1, MatchLabel.SF2]
+        return [MatchLabel.knockout] * (self.size >> round_num)
+
+    def round_matches(self, round_num: int) -> List[BracketMatch]:
+        return self._rounds[round_num]
+
+    def stage(self, round_num: int) -> TournamentStage:
+        if round_num == self.rounds:
+            return TournamentStage.final
+        if round_num == self.rounds - 1:
+            return TournamentStage.semi_final
+        return TournamentStage.knockout
+
+    @property
+    def ranks_needed(self) -> int:
+        """How deep into each group's standings the qualifiers reach."""
+        return self.per_group + (1 if self.extra else 0)
+
+    def check_groups(self, group_sizes: Sequence[int]):
+        """Raise ValueError unless groups of these sizes can fill every first-round slot."""
+        if len(group_sizes) != self.group_count:
+            raise ValueError(f"Expected {self.group_count} groups, got {len(group_sizes)}")
+        if min(group_sizes) < self.per_group or sum(1 for n in group_sizes if n > self.per_group) < self.extra:
+            raise ValueError(f"The groups are too small to send {self.size} teams to the knockout stage")
+
+    @staticmethod
+    def resolve(feeder: Feeder, placings: Dict[Tuple[int, int], int], best: Dict[int, List[int]],
+                results: Dict[int, Tuple[int, int]]) -> Optional[int]:
+        """Team id filling a slot, looked up from group placings, cross-group rankings or earlier results."""
+        if feeder.kind == GROUP:
+            return placings.get((feeder.ref, feeder.rank))
+        if feeder.kind == BEST:
+            ranked = best.get(feeder.rank, [])
+            return ranked[feeder.ref - 1] if feeder.ref <= len(ranked) else None
+        result = results.get(feeder.ref)
+        if result is None:
+            return None
+        return result[0] if feeder.kind == WINNER else result[1]
+
+@lru_cache(maxsize=64)
+def get_bracket(size: int, group_count: int) -> Bracket:
+    """Brackets depend only on their shape, so they are built once and shared."""
+    return Bracket(size, group_count)
+
+def placings(standings: List[dict], ranks_needed: int) -> Tuple[Dict[Tuple[int, int], int], Dict[int, List[int]]]:
+    """
+    Group placings {(group, rank): team_id} from standings sorted by group and rank, plus the teams
+    at each placing ranked against each other across groups for BEST feeders.
+    """
+    by_group: Dict[Tuple[int, int], int] = {}
+    across: Dict[int, List[dict]] = {}
+    rank = 0
+    group = None
+    for entry in standings:
+        rank = rank + 1 if entry["group"] == group else 1
+        group = entry["group"]
+        if rank <= ranks_needed:
+            by_group[(group, rank)] = entry["team_id"]
+            across.setdefault(rank, []).append(entry)
+    best = {
+        rank: [e["team_id"] for e in sorted(entries, key=lambda e: (
+            -e["match_points"], -e["game_points"], -e["sonneborn_berger"],
+            UNSET_TIEBREAK if e["manual_tb4"] is None else e["manual_tb4"]
+        ))]
+        for rank, entries in across.items()
+    }
+    return by_group, best
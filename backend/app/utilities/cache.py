@@ -0,0 +1,80 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+from ..models import Tournament
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+_responses: "OrderedDict[tuple, bytes]" = OrderedDict()
+_lock = threading.Lock()
+
+def get_version(db: Session, tournament_id: int) -> Optional[int]:
+    """Current data version of a tournament, None if it does not exist."""
+    return db.query(Tournament.version).filter(Tournament.id == tournament_id).scalar()
+
+def bump_version(db: Session, tournament_id: int, stats_stale: bool = False):
+    """
+    Mark everything derived from a tournament's results as stale.
+    Runs inside the caller's transaction so the new version becomes visible together with the data.
+    With stats_stale the stored team/player totals are left behind the results until a recompute
+    catches up; otherwise they stay current if they were current before this write.
+    """
+    values = {Tournament.version: Tournament.version + 1}
+    if not stats_stale:
+        values[Tournament.stats_version] = case(
+            (Tournament.stats_version == Tournament.version, Tournament.version + 1),
+            else_=Tournament.stats_version
+        )
+    db.query(Tournament).filter(Tournament.id == tournament_id).update(values, synchronize_session=False)
+
+def mark_stats_recomputed(db: Session, tournament_id: int, seen_version: int):
+    """
+    Bump the version after a full recompute that started at seen_version. The stats count as
+    current unless another write landed in between, in which case that write's recompute follows.
+    """
+    db.query(Tournament).filter(Tournament.id == tournament_id).update({
+        Tournament.version: Tournament.version + 1,
+        Tournament.stats_version: case(
+            (Tournament.version == seen_version, Tournament.version + 1),
+            else_=Tournament.stats_version
+        ),
+    }, synchronize_session=False)
+
+def invalidate(tournament_id: int):
+    with _lock:
+        for key in [k for k in _responses if k[1] == tournament_id]:
+            del _responses[key]
+
+def _etag(kind: str, tournament_id: int, version: int) -> str:
+    return f'"{kind}-{tournament_id}-{version}"'
+
+async def versioned_response(request: Request, kind: str, tournament_id: int, version: int,
+                             build: Callable[[], Awaitable[BaseModel]]) -> Response:
+    """
+    Serve a tournament read model from serialized bytes cached per (kind, tournament, version),
+    answering 304 when the client already holds that version.
+    """
+    etag = _etag(kind, tournament_id, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+
+    key = (kind, tournament_id, version)
+    with _lock:
+        body = _responses.get(key)
+        if body is not None:
+            _responses.move_to_end(key)
+    if body is None:
+        body = (await build()).model_dump_json().encode()
+        with _lock:
+            for stale in [k for k in _responses if k[:2] == key[:2] and k != key]:
+                del _responses[stale]
+            _responses[key] = body
+            while len(_responses) > RESPONSE_CACHE_SIZE:
+                _responses.popitem(last=False)
+    return Response(content=body, media_type="application/json", headers=headers)
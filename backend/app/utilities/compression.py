@@ -0,0 +1,179 @@
+import os
+import threading
+import zlib
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from .metrics import _route_template
+from .static import COMPRESSIBLE_TYPES, accepted_encodings, brotli
+
+# Bodies below this many bytes are sent as they are; compressing them costs more than it saves
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+class _Gzip:
+    name = "gzip"
+
+    def __init__(self):
+        self._z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Sync flush so every streamed chunk reaches the client without waiting for the next
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush()
+
+class _Brotli:
+    name = "br"
+
+    def __init__(self):
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.finish()
+
+class RouteCompression:
+    __slots__ = ("compressed", "skipped", "bytes_in", "bytes_out")
+
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+_routes: Dict[Tuple[str, str], RouteCompression] = {}
+_lock = threading.Lock()
+
+def _record(method: str, route: str, bytes_in: int, bytes_out: Optional[int]):
+    with _lock:
+        stats = _routes.get((method, route))
+        if stats is None:
+            stats = _routes[(method, route)] = RouteCompression()
+        if bytes_out is None:
+            stats.skipped += 1
+        else:
+            stats.compressed += 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+
+def compression_stats() -> Dict[str, Dict]:
+    """Per route: responses compressed and sent as they were, bytes before and after, and the ratio."""
+    with _lock:
+        return {
+            f"{method} {route}": {
+                "compressed": s.compressed,
+                "skipped": s.skipped,
+                "bytes_in": s.bytes_in,
+                "bytes_out": s.bytes_out,
+                "ratio": s.bytes_out / s.bytes_in if s.bytes_in else None,
+            }
+            for (method, route), s in sorted(_routes.items())
+        }
+
+def _encoder(accept_encoding: str):
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return _Brotli()
+    if "gzip" in accepted:
+        return _Gzip()
+    return None
+
+def _encoded_etag(etag: str, encoding: str) -> str:
+    """The ETag of the `encoding` representation, as static assets tag theirs: "<tag>-<encoding>"."""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+def _identity_tags(header: str, encoding: str) -> Tuple[str, set]:
+    """
+    If-None-Match extended with the identity form of every tag carrying this encoding's suffix, so the
+    app can match its own ETags, and those identity forms: a 304 for one revalidates the encoded body.
+    """
+    suffix = f'-{encoding}"'
+    tags = [tag.strip() for tag in header.split(",")]
+    identity = {tag[:-len(suffix)] + '"' for tag in tags if tag.endswith(suffix)} - set(tags)
+    return ", ".join(tags + sorted(identity)), identity
+
+class CompressionMiddleware:
+    """
+    Brotli or gzip for API responses of at least COMPRESS_MIN_BYTES, streamed chunk by chunk so
+    a streamed listing is never held in memory whole. Already-encoded bodies (precompressed static
+    files) and event streams pass through untouched. A compressed response's ETag gets the encoding
+    as a suffix, so it never shares a strong validator with the identity body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoder = _encoder(Headers(scope=scope).get("accept-encoding", ""))
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        revalidating = set()
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match is not None:
+            if_none_match, revalidating = _identity_tags(if_none_match, encoder.name)
+            scope = dict(scope, headers=[(k, v) for k, v in scope["headers"] if k != b"if-none-match"]
+                         + [(b"if-none-match", if_none_match.encode("latin-1"))])
+
+        state = {"start": None, "passthrough": False, "bytes_in": 0, "bytes_out": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] == 304 and headers.get("etag") in revalidating:
+                    # Revalidating the compressed body the client holds
+                    mutable = MutableHeaders(raw=message["headers"])
+                    mutable["ETag"] = _encoded_etag(mutable["etag"], encoder.name)
+                    mutable.add_vary_header("Accept-Encoding")
+                content_type = headers.get("content-type", "")
+                if (message["status"] < 200 or message["status"] in (204, 304) or "content-encoding" in headers
+                        or not content_type.startswith(COMPRESSIBLE_TYPES) or content_type.startswith("text/event-stream")):
+                    state["passthrough"] = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether the response is worth compressing
+                    state["start"] = message
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start = state["start"]
+            if start is not None and not more_body and len(body) < COMPRESS_MIN_BYTES:
+                state["passthrough"] = True
+                _record(scope["method"], _route_template(scope), len(body), None)
+                await send(start)
+                await send(message)
+                return
+            data = encoder.chunk(body) if more_body else encoder.finish(body)
+            state["bytes_in"] += len(body)
+            state["bytes_out"] += len(data)
+
+            if start is not None:
+                state["start"] = None
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoder.name
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = _encoded_etag(headers["etag"], encoder.name)
+                if more_body:
+                    if "content-length" in headers:
+                        del headers["content-length"]
+                else:
+                    headers["Content-Length"] = str(len(data))
+                await send(start)
+            if not more_body:
+                _record(scope["method"], _route_template(scope), state["bytes_in"], state["bytes_out"])
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,110 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+from typing import Dict, Optional, Set
+from sqlalchemy.orm import Session
+from .cache import get_version
+
+# Events buffered per subscriber; a subscriber that falls further behind is told to resync instead
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "64"))
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+
+RESYNC = b"event: resync\ndata: {}\n\n"
+HEARTBEAT = b": keep-alive\n\n"
+
+class Subscription:
+    def __init__(self, tournament_id: int):
+        self.tournament_id = tournament_id
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        self.lagged = 0
+
+    def deliver(self, payload: bytes):
+        """Queue an event, or replace the backlog with a single resync event when the client cannot keep up."""
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.lagged += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+class Broker:
+    """
+    In-process fan-out of tournament events to SSE subscribers.
+    Publishing is safe from any thread; delivery happens on the event loop serving the subscribers.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.resyncs = 0
+
+    def subscribe(self, tournament_id: int) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(tournament_id)
+        self._subscribers.setdefault(tournament_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.tournament_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.tournament_id]
+        self.resyncs += subscription.lagged
+
+    def has_subscribers(self, tournament_id: int) -> bool:
+        return tournament_id in self._subscribers
+
+    def publish(self, tournament_id: int, event: str, data: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self.has_subscribers(tournament_id):
+            return
+        with self._lock:
+            event_id = next(self._ids)
+            self.published += 1
+        payload = f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+        try:
+            loop.call_soon_threadsafe(self._fan_out, tournament_id, payload)
+        except RuntimeError:
+            # The loop shut down between the check and the call
+            pass
+
+    def _fan_out(self, tournament_id: int, payload: bytes):
+        for subscription in self._subscribers.get(tournament_id, ()):
+            subscription.deliver(payload)
+
+    def stats(self) -> Dict:
+        return {
+            "subscribers": {tid: len(subs) for tid, subs in self._subscribers.items()},
+            "published": self.published,
+            "resyncs": self.resyncs + sum(s.lagged for subs in self._subscribers.values() for s in subs),
+        }
+
+broker = Broker()
+
+def publish(tournament_id: int, event: str, data: dict):
+    broker.publish(tournament_id, event, data)
+
+def publish_standings(db: Session, tournament_id: int):
+    """Tell subscribers the standings and best players changed; they refetch with the new version's ETag."""
+    if broker.has_subscribers(tournament_id):
+        publish(tournament_id, "standings_updated", {"version": get_version(db, tournament_id)})
+
+async def stream(tournament_id: int, is_disconnected):
+    """SSE body for one subscriber, with heartbeats so proxies keep idle connections open."""
+    subscription = broker.subscribe(tournament_id)
+    try:
+        yield b"retry: 3000\n\n"
+        while not await is_disconnected():
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,159 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Requests over either budget are logged with their route, statement count and timings
+QUERY_BUDGET = int(os.getenv("METRICS_QUERY_BUDGET", "25"))
+LATENCY_BUDGET_MS = float(os.getenv("METRICS_LATENCY_BUDGET_MS", "500"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+# Sync handlers run in the threadpool with a copy of the request context, so they share this object
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+HISTOGRAMS = (
+    ("chesshub_request_duration_seconds", "Request latency including the handler and response serialization", LATENCY_BUCKETS),
+    ("chesshub_request_db_seconds", "Time spent executing SQL statements per request", LATENCY_BUCKETS),
+    ("chesshub_request_db_statements", "SQL statements executed per request", STATEMENT_BUCKETS),
+    ("chesshub_response_size_bytes", "Response body size", SIZE_BUCKETS),
+)
+
+class RouteMetrics:
+    def __init__(self):
+        self.histograms = [Histogram(buckets) for _, _, buckets in HISTOGRAMS]
+        self.statuses: Dict[int, int] = {}
+
+_routes: Dict[Tuple[str, str], RouteMetrics] = {}
+_lock = threading.Lock()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - conn.info["query_start"].pop()
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Static files and the SPA fallback are folded together to keep label cardinality bounded
+    return "<static>"
+
+def record(method: str, route: str, status: int, seconds: float, stats: RequestStats, size: int,
+           streaming: bool = False):
+    with _lock:
+        metrics = _routes.get((method, route))
+        if metrics is None:
+            metrics = _routes[(method, route)] = RouteMetrics()
+        for histogram, value in zip(metrics.histograms, (seconds, stats.db_seconds, stats.statements, size)):
+            histogram.observe(value)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    # Event streams stay open by design, so only their statement count is held to a budget
+    if stats.statements > QUERY_BUDGET or (seconds * 1000 > LATENCY_BUDGET_MS and not streaming):
+        logger.warning(
+            "%s %s over budget: %.1f ms (budget %.0f), %s statements (budget %s), %.1f ms in the database, %s bytes",
+            method, route, seconds * 1000, LATENCY_BUDGET_MS, stats.statements, QUERY_BUDGET,
+            stats.db_seconds * 1000, size
+        )
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so the request context, and with it the statement counter, reaches the handler."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        response = {"status": 500, "size": 0, "streaming": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["streaming"] = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            record(scope["method"], _route_template(scope), response["status"],
+                   time.perf_counter() - start, stats, response["size"], response["streaming"])
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def render() -> str:
+    """All route metrics in the Prometheus text exposition format."""
+    with _lock:
+        routes = sorted(_routes.items())
+        lines = [
+            "# HELP chesshub_requests_total Requests by route and status",
+            "# TYPE chesshub_requests_total counter",
+        ]
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'chesshub_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+        for i, (name, help_text, _) in enumerate(HISTOGRAMS):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), metrics in routes:
+                lines.extend(metrics.histograms[i].lines(name, f'method="{method}",route="{_escape(route)}"'))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,106 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Type
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from .streaming import json_list
+
+# Rows per page when a client pages by cursor without asking for a size, and the most it may ask for.
+# A request with neither limit nor cursor gets the whole list, as before paging existed.
+PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "500"))
+MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+    total: Optional[int]
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque token for the sort key of the last row on a page."""
+    plain = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(plain, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, keys: Sequence) -> List[Any]:
+    """Sort key values from a token made by encode_cursor for the same keys; ValueError if it is not one."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+    return [_decode_value(key, value) for key, value in zip(keys, values)]
+
+def _decode_value(key, value):
+    """A cursor value checked against its key's column type, so a tampered token is refused, not queried."""
+    if value is None:
+        return value
+    expected = key.type.python_type
+    if expected is datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+    # bool is a subclass of int: true must not pass for an id, nor 1 for a flag
+    if isinstance(value, bool) != (expected is bool):
+        raise ValueError("Invalid cursor")
+    if expected is float and isinstance(value, int):
+        # A whole number may come back from JSON as an int
+        return float(value)
+    if not isinstance(value, expected):
+        raise ValueError("Invalid cursor")
+    return value
+
+async def paginate(db: AsyncSession, query, keys: Sequence, limit: Optional[int], cursor: Optional[str] = None,
+                   descending: bool = False, offset: int = 0, with_total: bool = False) -> Page:
+    """
+    One page of `query` in keyset order: rows sorted by `keys` (unique together, all in the same
+    direction) that come after the cursor. Each page is one indexed range read however deep it is;
+    the total is counted only when asked for. An offset is still honoured for clients that page
+    by skipping rows, at the usual cost of reading every skipped row. Without a limit or a cursor
+    every row is returned, in the same order, with no next cursor.
+    """
+    total = None
+    if with_total:
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+    order = [key.desc() for key in keys] if descending else list(keys)
+    if limit is None and cursor is None:
+        return Page((await db.scalars(query.order_by(*order).offset(offset or None))).all(), None, total)
+    limit = limit or PAGE_SIZE
+
+    if cursor is not None:
+        after = decode_cursor(cursor, keys)
+        if len(keys) == 1:
+            row, bound = keys[0], after[0]
+        else:
+            # Typed binds, so values like datetimes compare in the column's stored format
+            row, bound = tuple_(*keys), tuple_(*(literal(value, key.type) for key, value in zip(keys, after)))
+        query = query.filter(row < bound if descending else row > bound)
+    items = (await db.scalars(query.order_by(*order).offset(offset or None).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], key.key) for key in keys])
+    return Page(items, next_cursor, total)
+
+def page_headers(page: Page) -> dict:
+    headers = {}
+    if page.next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(page.total)
+    return headers
+
+def page_response(page: Page, model: Type[BaseModel]) -> Response:
+    """The page's rows as a JSON array, with the next cursor and total in headers when there are any."""
+    response = json_list(page.items, model)
+    response.headers.update(page_headers(page))
+    return response
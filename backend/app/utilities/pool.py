@@ -0,0 +1,190 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+WAIT_SAMPLES = 1000
+
+def engine_options() -> Dict:
+    """Pool keyword arguments for create_engine/create_async_engine, read from the environment."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+
+class PoolStats:
+    """Counters for one engine's pool, updated from pool events."""
+
+    def __init__(self, name: str, options: Dict):
+        self.name = name
+        self.options = options
+        # Checkouts waiting longer than this are logged as a sign the pool is running dry
+        self.slow_checkout_ms = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", "100"))
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.slow_checkouts = 0
+        self.peak_checked_out = 0
+        self.waits_ms = deque(maxlen=WAIT_SAMPLES)
+        self.connects_ms = deque(maxlen=WAIT_SAMPLES)
+
+    def record_connect(self, seconds: float):
+        with self._lock:
+            self.connects_ms.append(seconds * 1000)
+
+    def record_wait(self, seconds: float, timed_out: bool):
+        ms = seconds * 1000
+        with self._lock:
+            self.waits_ms.append(ms)
+            if timed_out:
+                self.timeouts += 1
+            elif ms > self.slow_checkout_ms:
+                self.slow_checkouts += 1
+        if timed_out:
+            logger.error("%s pool exhausted: no connection after %.0f ms (%s)", self.name, ms, self._usage())
+        elif ms > self.slow_checkout_ms:
+            logger.warning("%s pool checkout waited %.0f ms (%s)", self.name, ms, self._usage())
+
+    def _usage(self) -> str:
+        return f"{self.pool.checkedout()} checked out, {self.pool.overflow()} overflow, size {self.pool.size()}"
+
+    @staticmethod
+    def _summary(samples_ms) -> Dict:
+        values = np.array(samples_ms) if samples_ms else np.zeros(1)
+        return {
+            "samples": len(samples_ms),
+            "mean": round(float(values.mean()), 3),
+            "p95": round(float(np.percentile(values, 95)), 3),
+            "max": round(float(values.max()), 3),
+        }
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            waits = self._summary(self.waits_ms)
+            connects = self._summary(self.connects_ms)
+            counters = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "overflow_connects": self.overflow_connects,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "slow_checkouts": self.slow_checkouts,
+                "peak_checked_out": self.peak_checked_out,
+            }
+        return {
+            "settings": self.options,
+            "size": self.pool.size(),
+            "checked_out": self.pool.checkedout(),
+            "checked_in": self.pool.checkedin(),
+            "overflow": self.pool.overflow(),
+            **counters,
+            "checkout_wait_ms": waits,
+            "connect_ms": connects,
+        }
+
+_stats: Dict[str, PoolStats] = {}
+
+class _TimedCheckout:
+    """
+    Times how long a checkout waits on the pool itself, which the pool events cannot see. A connection
+    opened during the checkout is timed on its own and left out of the wait, so a slow database
+    handshake is not mistaken for a pool running dry.
+    """
+    stats: PoolStats
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        record.connect_seconds = time.perf_counter() - start
+        self.stats.record_connect(record.connect_seconds)
+        return record
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        # Set only on a record this checkout just created; taken so a later checkout of it does not subtract it again
+        connect_seconds = record.__dict__.pop("connect_seconds", 0.0)
+        self.stats.record_wait(time.perf_counter() - start - connect_seconds, timed_out=False)
+        return record
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        self.stats.pool = pool
+        return pool
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+def instrument(name: str, engine, options: Dict):
+    """Attach counters to an engine built with one of the instrumented pool classes."""
+    stats = PoolStats(name, options)
+    pool = engine.pool
+    pool.stats = stats
+    stats.pool = pool
+    _stats[name] = stats
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, record):
+        with stats._lock:
+            stats.connects += 1
+            overflow = stats.pool.overflow() > 0
+            if overflow:
+                stats.overflow_connects += 1
+        if overflow:
+            logger.info("%s pool opened an overflow connection (%s)", name, stats._usage())
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, record, proxy):
+        checked_out = stats.pool.checkedout()
+        with stats._lock:
+            stats.checkouts += 1
+            stats.peak_checked_out = max(stats.peak_checked_out, checked_out)
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, record):
+        with stats._lock:
+            stats.checkins += 1
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, record, exception):
+        with stats._lock:
+            stats.invalidations += 1
+        logger.warning("%s pool invalidated a connection: %s", name, exception)
+
+def pool_stats() -> Dict[str, Dict]:
+    return {name: stats.snapshot() for name, stats in _stats.items()}
+
+def log_pool_stats():
+    for name, snapshot in pool_stats().items():
+        logger.info(
+            "%s pool: %s checkouts, %s overflow connects, %s timeouts, %s slow checkouts, "
+            "peak %s checked out, checkout wait p95 %.1f ms max %.1f ms, connect p95 %.1f ms",
+            name, snapshot["checkouts"], snapshot["overflow_connects"], snapshot["timeouts"],
+            snapshot["slow_checkouts"], snapshot["peak_checked_out"],
+            snapshot["checkout_wait_ms"]["p95"], snapshot["checkout_wait_ms"]["max"], snapshot["connect_ms"]["p95"]
+        )
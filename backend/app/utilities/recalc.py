@@ -0,0 +1,96 @@
+import logging
+import os
+import threading
+from typing import Dict
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models import Game, Match
+from ..enums import MatchResult, Tiebreaker
+from .stats import apply_game_result, apply_tiebreaker_result, record_game_result, record_tiebreaker_result
+from .tournament import ensure_stats_current, recalculate_round_stats, record_round_change
+from . import live
+
+logger = logging.getLogger(__name__)
+
+# With deferred stats, result writes only touch games and matches; team and player totals are
+# recomputed once per tournament by a debounced job covering every write queued in the window.
+DEFER_STATS = os.getenv("DEFER_STATS", "true").lower() == "true"
+RECALC_DEBOUNCE_MS = int(os.getenv("RECALC_DEBOUNCE_MS", "250"))
+
+_timers: Dict[int, threading.Timer] = {}
+_running: Dict[int, threading.Lock] = {}
+_state_lock = threading.Lock()
+
+def _tournament_lock(tournament_id: int) -> threading.Lock:
+    with _state_lock:
+        return _running.setdefault(tournament_id, threading.Lock())
+
+def schedule(tournament_id: int):
+    """Queue a recompute for the tournament unless one is already waiting to run."""
+    with _state_lock:
+        if tournament_id in _timers:
+            return
+        timer = threading.Timer(RECALC_DEBOUNCE_MS / 1000, _run, args=(tournament_id,))
+        timer.daemon = True
+        _timers[tournament_id] = timer
+    timer.start()
+
+def _run(tournament_id: int):
+    with _state_lock:
+        _timers.pop(tournament_id, None)
+    with _tournament_lock(tournament_id):
+        db = SessionLocal()
+        try:
+            if ensure_stats_current(db, tournament_id):
+                live.publish_standings(db, tournament_id)
+        except Exception:
+            db.rollback()
+            logger.exception("Deferred stats recompute failed for tournament %s", tournament_id)
+        finally:
+            db.close()
+
+def flush(db: Session, tournament_id: int):
+    """
+    Run a queued recompute now, or wait for one already running, so the caller reads current totals.
+    Also catches up writes queued by other worker processes, since staleness is tracked in the database.
+    """
+    with _state_lock:
+        timer = _timers.pop(tournament_id, None)
+    if timer:
+        timer.cancel()
+    with _tournament_lock(tournament_id):
+        if ensure_stats_current(db, tournament_id):
+            live.publish_standings(db, tournament_id)
+
+def shutdown():
+    """Run every queued recompute before the process exits."""
+    with _state_lock:
+        pending = list(_timers.items())
+        _timers.clear()
+    for tournament_id, timer in pending:
+        timer.cancel()
+        _run(tournament_id)
+
+def submit_game_result(db: Session, game: Game, result: MatchResult):
+    if not DEFER_STATS:
+        apply_game_result(db, game, result)
+        live.publish_standings(db, game.match.tournament_id)
+        return
+    record_game_result(db, game, result)
+    schedule(game.match.tournament_id)
+
+def submit_tiebreaker_result(db: Session, match: Match, tiebreaker: Tiebreaker):
+    if not DEFER_STATS:
+        apply_tiebreaker_result(db, match, tiebreaker)
+        live.publish_standings(db, match.tournament_id)
+        return
+    record_tiebreaker_result(db, match, tiebreaker)
+    schedule(match.tournament_id)
+
+def submit_round_change(db: Session, tournament_id: int, round_number: int):
+    if not DEFER_STATS:
+        recalculate_round_stats(db, tournament_id, round_number)
+        live.publish_standings(db, tournament_id)
+        return
+    record_round_change(db, tournament_id, round_number)
+    schedule(tournament_id)
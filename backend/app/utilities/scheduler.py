@@ -0,0 +1,52 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+def berger_round(teams: Sequence[Optional[int]], round_num: int) -> List[Tuple[int, int]]:
+    """
+    (white, black) pairings of one round of a Berger table, computed directly for any round.
+
+    The last team is fixed and the others sit on a circle of m = len(teams) - 1 slots; in round r
+    slot r meets the fixed team and slots r + k and r - k meet each other. Every pair meets exactly
+    once over m rounds and colours alternate from round to round. None marks the bye.
+    """
+    n = len(teams)
+    m = n - 1
+    r = (round_num - 1) % m
+    fixed = teams[-1]
+    pairs = [(fixed, teams[r]) if r % 2 else (teams[r], fixed)]
+    for k in range(1, n // 2):
+        up, down = teams[(r + k) % m], teams[(r - k) % m]
+        pairs.append((up, down) if k % 2 else (down, up))
+    return [(white, black) for white, black in pairs if white is not None and black is not None]
+
+def snake_groups(strengths: Sequence[float], group_count: int) -> List[int]:
+    """
+    Group number (1-based) of each team, dealing teams in order of strength 1, 2, ..., G, G, ..., 2, 1, 1, 2, ...
+    so every group gets a comparable spread. Equal strengths keep their given order.
+    """
+    ranked = sorted(range(len(strengths)), key=lambda i: (-strengths[i], i))
+    groups = [0] * len(strengths)
+    for position, team in enumerate(ranked):
+        row, column = divmod(position, group_count)
+        groups[team] = (column if row % 2 == 0 else group_count - 1 - column) + 1
+    return groups
+
+def padded_groups(team_ids: Sequence[int], groups: Sequence[int]) -> Dict[int, List[Optional[int]]]:
+    """Team ids per group number in the given order, with a None bye slot added to odd-sized groups."""
+    members: Dict[int, List[Optional[int]]] = {}
+    for team_id, group_number in zip(team_ids, groups):
+        members.setdefault(group_number, []).append(team_id)
+    for ids in members.values():
+        if len(ids) % 2:
+            ids.append(None)
+    return dict(sorted(members.items()))
+
+def group_stage_rounds(members: Dict[int, List[Optional[int]]]) -> int:
+    return max((len(ids) - 1 for ids in members.values()), default=0)
+
+def group_fixtures(members: Dict[int, List[Optional[int]]]) -> Iterator[Tuple[int, int, int, int]]:
+    """(round number, group number, white, black) of every group-stage match, round by round."""
+    for round_num in range(1, group_stage_rounds(members) + 1):
+        for group_number, ids in members.items():
+            if round_num < len(ids):
+                for white, black in berger_round(ids, round_num):
+                    yield round_num, group_number, white, black
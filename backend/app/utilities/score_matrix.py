@@ -0,0 +1,203 @@
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from ..models import Match, Game, Team, Player
+from ..enums import MatchResult, MatchLabel, Tiebreaker
+from . import ties
+
+# Stands in for an unset manual tiebreak, so it sorts after every assigned value
+UNSET_TIEBREAK = np.inf
+
+def _float(values) -> np.ndarray:
+    return np.array([UNSET_TIEBREAK if v is None else v for v in values], dtype=float)
+
+def _optional(value: float) -> Optional[float]:
+    return None if value == UNSET_TIEBREAK else float(value)
+
+class _Entity(NamedTuple):
+    id: int
+    name: str
+    group: Optional[int] = None
+    manual_tb4: Optional[float] = None
+    manual_tb3: Optional[float] = None
+
+def standings_order(group: np.ndarray, match_points: np.ndarray, game_points: np.ndarray,
+                    sonneborn_berger: np.ndarray, manual_tb4: np.ndarray) -> np.ndarray:
+    """Indices sorting teams by group, then MP, GP and SB descending, then manual TB4."""
+    return np.lexsort((manual_tb4, -sonneborn_berger, -game_points, -match_points, group))
+
+def best_players_order(points: np.ndarray, wins: np.ndarray, manual_tb3: np.ndarray) -> np.ndarray:
+    """Indices sorting players by points and wins descending, then manual TB3."""
+    return np.lexsort((manual_tb3, -wins, -points))
+
+class TournamentState:
+    """
+    Score matrices of one tournament, derived from its matches and games.
+
+    Teams and players are addressed by their position in ``team_ids``/``player_ids``.
+    ``game_points[i, j]`` and ``match_points[i, j]`` hold what team i scored against
+    team j over completed group matches; player vectors hold completed-game totals.
+    """
+
+    def __init__(self, teams, players, rows):
+        self.team_ids = np.array([t.id for t in teams], dtype=np.int64)
+        self.team_names = [t.name for t in teams]
+        self.groups = np.array([t.group for t in teams], dtype=np.int64)
+        self.manual_tb4 = _float(t.manual_tb4 for t in teams)
+        self.player_ids = np.array([p.id for p in players], dtype=np.int64)
+        self.player_names = [p.name for p in players]
+        self.manual_tb3 = _float(p.manual_tb3 for p in players)
+
+        team_index = {team_id: i for i, team_id in enumerate(self.team_ids.tolist())}
+        player_index = {player_id: i for i, player_id in enumerate(self.player_ids.tolist())}
+        n, m = len(teams), len(players)
+
+        counted = {}
+        for row in rows:
+            if row.match_completed and row.label == MatchLabel.group:
+                counted[row.match_id] = row
+        matches = list(counted.values())
+        white = np.array([team_index[r.white_team_id] for r in matches], dtype=np.int64)
+        black = np.array([team_index[r.black_team_id] for r in matches], dtype=np.int64)
+        white_score = np.array([r.match_white_score for r in matches], dtype=float)
+        black_score = np.array([r.match_black_score for r in matches], dtype=float)
+        points = np.array([self._match_points(r) for r in matches], dtype=float).reshape(-1, 2)
+        white_mp, black_mp = points[:, 0], points[:, 1]
+
+        self.game_points = np.zeros((n, n))
+        self.match_points = np.zeros((n, n))
+        self.played = np.zeros((n, n), dtype=np.int64)
+        np.add.at(self.game_points, (white, black), white_score)
+        np.add.at(self.game_points, (black, white), black_score)
+        np.add.at(self.match_points, (white, black), white_mp)
+        np.add.at(self.match_points, (black, white), black_mp)
+        np.add.at(self.played, (white, black), 1)
+        np.add.at(self.played, (black, white), 1)
+        self.team_wins = np.bincount(white, white_mp == 2.0, n) + np.bincount(black, black_mp == 2.0, n)
+        self.team_draws = np.bincount(white, white_mp == 1.0, n) + np.bincount(black, black_mp == 1.0, n)
+
+        games = [r for r in rows if r.game_completed]
+        sides = np.array(
+            [player_index[r.white_player_id] for r in games] + [player_index[r.black_player_id] for r in games],
+            dtype=np.int64
+        )
+        scores = np.array([r.game_white_score for r in games] + [r.game_black_score for r in games], dtype=float)
+        self.player_games = np.bincount(sides, minlength=m).astype(np.int64)
+        self.player_points = np.bincount(sides, scores, m)
+        self.player_wins = np.bincount(sides, scores == 1.0, m).astype(np.int64)
+        self.player_draws = np.bincount(sides, scores == 0.5, m).astype(np.int64)
+
+    @staticmethod
+    def _match_points(row):
+        if row.result == MatchResult.white_win or (row.result == MatchResult.tiebreaker and row.tiebreaker == Tiebreaker.white_win):
+            return 2.0, 0.0
+        if row.result == MatchResult.black_win or (row.result == MatchResult.tiebreaker and row.tiebreaker == Tiebreaker.black_win):
+            return 0.0, 2.0
+        if row.result == MatchResult.draw:
+            return 1.0, 1.0
+        return 0.0, 0.0
+
+    @classmethod
+    def load(cls, db: Session, tournament_id: int) -> "TournamentState":
+        """
+        One query: every team, its players and the games each player had white in, with the game's
+        match. Outer joins keep teams without players and players without games.
+        """
+        rows = db.query(
+            Team.id.label("team_id"),
+            Team.name.label("team_name"),
+            Team.group,
+            Team.manual_tb4,
+            Player.id.label("player_id"),
+            Player.name.label("player_name"),
+            Player.manual_tb3,
+            Match.id.label("match_id"),
+            Match.label,
+            Match.white_team_id,
+            Match.black_team_id,
+            Match.white_score.label("match_white_score"),
+            Match.black_score.label("match_black_score"),
+            Match.result,
+            Match.tiebreaker,
+            Match.is_completed.label("match_completed"),
+            Game.white_player_id,
+            Game.black_player_id,
+            Game.white_score.label("game_white_score"),
+            Game.black_score.label("game_black_score"),
+            Game.is_completed.label("game_completed"),
+        ).select_from(Team).outerjoin(Player, Player.team_id == Team.id).outerjoin(
+            Game, Game.white_player_id == Player.id
+        ).outerjoin(Match, Match.id == Game.match_id).filter(
+            Team.tournament_id == tournament_id
+        ).order_by(Team.id, Player.id).all()
+
+        teams, players = {}, {}
+        for row in rows:
+            teams.setdefault(row.team_id, _Entity(row.team_id, row.team_name, row.group, row.manual_tb4))
+            if row.player_id is not None:
+                players.setdefault(row.player_id, _Entity(row.player_id, row.player_name, manual_tb3=row.manual_tb3))
+        games = [row for row in rows if row.match_id is not None]
+        return cls(list(teams.values()), sorted(players.values(), key=lambda p: p.id), games)
+
+    # -- Team standings --
+    def team_match_points(self) -> np.ndarray:
+        return self.match_points.sum(axis=1)
+
+    def team_game_points(self) -> np.ndarray:
+        return self.game_points.sum(axis=1)
+
+    def sonneborn_berger(self) -> np.ndarray:
+        """Game points against each opponent weighted by that opponent's match points."""
+        return self.game_points @ self.team_match_points()
+
+    def standings_order(self) -> np.ndarray:
+        return standings_order(self.groups, self.team_match_points(), self.team_game_points(),
+                               self.sonneborn_berger(), self.manual_tb4)
+
+    def standings(self) -> List[Dict]:
+        """Rows shaped like crud.calculate_standings, in ranking order."""
+        match_points = self.team_match_points()
+        game_points = self.team_game_points()
+        sb = self.sonneborn_berger()
+        matches_played = self.played.sum(axis=1)
+        order = standings_order(self.groups, match_points, game_points, sb, self.manual_tb4)
+        return [{
+            "team_id": int(self.team_ids[i]),
+            "team_name": self.team_names[i],
+            "group": int(self.groups[i]),
+            "match_points": float(match_points[i]),
+            "game_points": float(game_points[i]),
+            "sonneborn_berger": float(sb[i]),
+            "manual_tb4": _optional(self.manual_tb4[i]),
+            "wins": int(self.team_wins[i]),
+            "losses": int(matches_played[i] - self.team_wins[i] - self.team_draws[i]),
+            "draws": int(self.team_draws[i]),
+            "matches_played": int(matches_played[i]),
+        } for i in order.tolist()]
+
+    def standings_ties(self, teams_to_check: int) -> Dict[int, Dict[int, List[int]]]:
+        """For the top teams of every group, the other teams of that group level on MP, GP and SB."""
+        clusters = ties.tie_clusters(self.standings(), ties.TEAM_KEYS, "team_id", "group", teams_to_check)
+        return ties.tied_with(clusters, teams_to_check)
+
+    # -- Best players --
+    def best_players_order(self) -> np.ndarray:
+        return best_players_order(self.player_points, self.player_wins, self.manual_tb3)
+
+    def best_players(self) -> List[Dict]:
+        """Rows shaped like crud.get_best_players, in ranking order."""
+        return [{
+            "player_id": int(self.player_ids[i]),
+            "player_name": self.player_names[i],
+            "points": float(self.player_points[i]),
+            "wins": int(self.player_wins[i]),
+            "tb3": _optional(self.manual_tb3[i]),
+            "games_played": int(self.player_games[i]),
+            "draws": int(self.player_draws[i]),
+            "losses": int(self.player_games[i] - self.player_wins[i] - self.player_draws[i]),
+        } for i in self.best_players_order().tolist()]
+
+    def best_players_ties(self, places: int = ties.BEST_PLAYER_PLACES) -> Dict[int, List[int]]:
+        """For the top players, the others level with them on points and wins."""
+        clusters = ties.tie_clusters(self.best_players(), ties.PLAYER_KEYS, "player_id", places=places)
+        return ties.tied_with(clusters, places).get(None, {})
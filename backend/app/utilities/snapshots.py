@@ -0,0 +1,55 @@
+from datetime import datetime
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from ..models import Player, PlayerRoundSnapshot, Team, TeamRoundSnapshot
+from .cache import bump_version
+from .score_matrix import TournamentState
+
+def snapshot_round(db: Session, tournament_id: int, round_number: int):
+    """
+    Record the standings and best players as they stand after a round, computed from the results
+    so deferred stat recomputes cannot leave them behind. One bulk insert per table; a round
+    completed again replaces its earlier snapshot.
+    """
+    state = TournamentState.load(db, tournament_id)
+    teams = []
+    rank, group = 0, None
+    for row in state.standings():
+        rank = rank + 1 if row["group"] == group else 1
+        group = row["group"]
+        teams.append({
+            "tournament_id": tournament_id,
+            "round_number": round_number,
+            "team_id": row["team_id"],
+            "group": row["group"],
+            "rank": rank,
+            "matches_played": row["matches_played"],
+            "wins": row["wins"],
+            "draws": row["draws"],
+            "match_points": row["match_points"],
+            "game_points": row["game_points"],
+            "sonneborn_berger": row["sonneborn_berger"],
+            "manual_tb4": row["manual_tb4"],
+        })
+    players = [{
+        "tournament_id": tournament_id,
+        "round_number": round_number,
+        "player_id": row["player_id"],
+        "rank": rank,
+        "games_played": row["games_played"],
+        "wins": row["wins"],
+        "draws": row["draws"],
+        "points": row["points"],
+        "tb3": row["tb3"],
+    } for rank, row in enumerate(state.best_players(), start=1)]
+
+    for model, rows in ((TeamRoundSnapshot, teams), (PlayerRoundSnapshot, players)):
+        db.execute(delete(model).where(model.tournament_id == tournament_id, model.round_number == round_number))
+        if rows:
+            db.execute(insert(model), rows)
+
+    taken_at = datetime.now()
+    team_ids = select(Team.id).where(Team.tournament_id == tournament_id)
+    db.execute(update(Team).where(Team.tournament_id == tournament_id).values(standings_snapshot_at=taken_at))
+    db.execute(update(Player).where(Player.team_id.in_(team_ids)).values(snapshot_at=taken_at))
+    bump_version(db, tournament_id)
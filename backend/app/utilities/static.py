@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from typing import Dict, NamedTuple, Optional
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Vite writes content-hashed bundles as assets/<name>-<8-character hash>.<ext>; their URL changes whenever
+# they do. Anything else, such as site-manifest.json or apple-touch-icon.png, keeps its URL and revalidates.
+FINGERPRINTED = re.compile(r"(^|/)assets/[^/]*-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/x-ndjson",
+                      "application/manifest+json", "image/svg+xml", "image/x-icon", "image/vnd.microsoft.icon",
+                      "application/wasm")
+MIN_COMPRESS_BYTES = 1024
+
+class Asset(NamedTuple):
+    path: str
+    media_type: str
+    etag: str
+    cache_control: str
+    # Content-encoding -> body, kept only where it is smaller than the file
+    encoded: Dict[str, bytes]
+    body: Optional[bytes] = None
+
+def _compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+def accepted_encodings(header: str) -> set:
+    """Content codings the client accepts, from an Accept-Encoding header; q=0 excludes one."""
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+class StaticAssets:
+    """
+    Serves the built frontend. Every file is read once at startup: compressible ones are kept
+    gzip- and brotli-encoded in memory, fingerprinted bundles get immutable caching, and index.html
+    is held in memory with an ETag and served for every path that is not a file, for client-side routing.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.assets: Dict[str, Asset] = {}
+        self.index: Optional[Asset] = None
+
+    def load(self):
+        assets = {}
+        saved = 0
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                url = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                asset = self._asset(url, path)
+                assets[url] = asset
+                if asset.encoded:
+                    saved += os.path.getsize(path) - min(len(body) for body in asset.encoded.values())
+        self.assets = assets
+        self.index = assets.get("index.html")
+        if self.index is None:
+            logger.warning("No index.html in %s; the frontend will not be served", self.directory)
+        logger.info("Static assets: %d files, %d KiB saved by precompression%s", len(assets), saved // 1024,
+                    "" if brotli else " (brotli not installed, gzip only)")
+
+    def _asset(self, url: str, path: str) -> Asset:
+        media_type = mimetypes.guess_type(url)[0] or "application/octet-stream"
+        fingerprinted = bool(FINGERPRINTED.search(url))
+        with open(path, "rb") as f:
+            content = f.read()
+        encoded = {}
+        if _compressible(media_type) and len(content) >= MIN_COMPRESS_BYTES:
+            if brotli is not None:
+                encoded["br"] = brotli.compress(content, quality=11)
+            encoded["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+            encoded = {name: body for name, body in encoded.items() if len(body) < len(content)}
+        return Asset(
+            path=path,
+            media_type=media_type,
+            etag=f'"{hashlib.sha1(content).hexdigest()[:16]}"',
+            cache_control=IMMUTABLE if fingerprinted else REVALIDATE,
+            encoded=encoded,
+            body=content if url == "index.html" else None,
+        )
+
+    def _lookup(self, path: str) -> Optional[Asset]:
+        url = path.lstrip("/")
+        asset = self.assets.get(url or "index.html") or self.assets.get(url.rstrip("/") + "/index.html")
+        if asset is not None:
+            return asset
+        # Missing files and API paths are real 404s; anything else is a client-side route
+        if url.startswith("api/") or "." in url.rsplit("/", 1)[-1]:
+            return None
+        return self.index
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+            await response(scope, receive, send)
+            return
+        asset = self._lookup(scope["path"])
+        if asset is None:
+            await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        encoding = None
+        if asset.encoded:
+            accepted = accepted_encodings(headers.get("accept-encoding", ""))
+            encoding = next((name for name in ("br", "gzip") if name in asset.encoded and name in accepted), None)
+        etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+        response_headers = {"ETag": etag, "Cache-Control": asset.cache_control}
+        if asset.encoded:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+            response = Response(status_code=304, headers=response_headers)
+        elif encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+            response = Response(asset.encoded[encoding], media_type=asset.media_type, headers=response_headers)
+        elif asset.body is not None:
+            response = Response(asset.body, media_type=asset.media_type, headers=response_headers)
+        else:
+            response = FileResponse(asset.path, media_type=asset.media_type, headers=response_headers)
+        await response(scope, receive, send)
@@ -0,0 +1,283 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.orm import Session, selectinload
+from ..database import count_queries
+from ..models import Match, Game, Team, Player
+from ..enums import MatchResult, MatchLabel, Tiebreaker
+from .tournament import update_match_result, recompute_tournament_stats, refresh_tournament_stats
+from .cache import bump_version, get_version, mark_stats_recomputed
+
+GAME_SCORES = {
+    MatchResult.white_win: (1.0, 0.0),
+    MatchResult.black_win: (0.0, 1.0),
+    MatchResult.draw: (0.5, 0.5),
+    MatchResult.pending: (0.0, 0.0),
+}
+
+TEAM_FIELDS = ("matches_played", "wins", "draws", "losses", "match_points", "game_points")
+PLAYER_FIELDS = ("games_played", "wins", "draws", "losses", "points")
+TEAM_STAT_FIELDS = TEAM_FIELDS + ("sonneborn_berger",)
+MATCH_FIELDS = ("white_score", "black_score", "result", "is_completed", "tiebreaker")
+
+# recompute_tournament_stats is one UPDATE for teams and one for players, whatever the tournament size;
+# the benchmark fails when it issues more
+RECOMPUTE_QUERY_BUDGET = 2
+
+TeamLine = Tuple[int, int, int, int, float, float]
+
+def _player_line(score: float, completed: bool) -> Tuple[int, int, int, int, float]:
+    if not completed:
+        return (0, 0, 0, 0, 0.0)
+    return (1, int(score == 1), int(score == 0.5), int(score not in (1, 0.5)), score)
+
+def _team_line(score: float, outcome: str) -> TeamLine:
+    if outcome == "win":
+        return (1, 1, 0, 0, 2.0, score)
+    if outcome == "draw":
+        return (1, 0, 1, 0, 1.0, score)
+    return (1, 0, 0, 1, 0.0, score)
+
+def _match_lines(match: Match) -> Tuple[Optional[TeamLine], Optional[TeamLine]]:
+    """Contribution of a match to both teams' standings, (None, None) if it does not count."""
+    if not (match.is_completed and match.label == MatchLabel.group):
+        return None, None
+    if match.result == MatchResult.white_win or (match.result == MatchResult.tiebreaker and match.tiebreaker == Tiebreaker.white_win):
+        white, black = "win", "loss"
+    elif match.result == MatchResult.black_win or (match.result == MatchResult.tiebreaker and match.tiebreaker == Tiebreaker.black_win):
+        white, black = "loss", "win"
+    elif match.result == MatchResult.draw:
+        white, black = "draw", "draw"
+    else:
+        white, black = "loss", "loss"
+    return _team_line(match.white_score, white), _team_line(match.black_score, black)
+
+def _delta(fields, old, new) -> Dict[str, float]:
+    return {field: n - o for field, o, n in zip(fields, old, new) if n != o}
+
+def _increment(db: Session, model, deltas: Dict[int, Dict[str, float]]):
+    """
+    Add per-row deltas to counter columns in one UPDATE, as "col = col + d" evaluated by the database,
+    so concurrent writers add up instead of overwriting each other.
+    """
+    values = {}
+    for field in {f for d in deltas.values() for f in d}:
+        by_id = {row_id: d[field] for row_id, d in deltas.items() if d.get(field)}
+        if by_id:
+            column = getattr(model, field)
+            values[column] = func.coalesce(column, 0) + case(by_id, value=model.id, else_=0)
+    if values:
+        db.execute(update(model).where(model.id.in_(list(deltas))).values(values)
+                   .execution_options(synchronize_session=False))
+
+def _lock_match(db: Session, match: Match):
+    """Re-read a match and its games under a row lock, so results on its boards apply one after the other."""
+    db.query(Match).filter(Match.id == match.id).with_for_update().populate_existing().one()
+    db.query(Game).filter(Game.match_id == match.id).populate_existing().all()
+
+def _other_matches(db: Session, match: Match, team_ids) -> List[Match]:
+    return db.query(Match).filter(
+        Match.tournament_id == match.tournament_id,
+        Match.id != match.id,
+        Match.is_completed == True,
+        Match.label == MatchLabel.group,
+        or_(Match.white_team_id.in_(team_ids), Match.black_team_id.in_(team_ids))
+    ).all()
+
+def _lock_teams(db: Session, team_ids) -> Dict[int, float]:
+    """Lock teams in id order, so concurrent writers queue up instead of deadlocking; their match points."""
+    rows = db.query(Team.id, Team.match_points).filter(Team.id.in_(team_ids)).order_by(Team.id).with_for_update().all()
+    return {row.id: row.match_points or 0 for row in rows}
+
+def _apply_match_delta(db: Session, match: Match, before: Tuple[Optional[TeamLine], Optional[TeamLine]]):
+    """
+    Move team totals and Sonneborn-Berger from a match's old contribution to its current one. Only the
+    two sides and their opponents are locked and touched, and every change is an increment.
+    """
+    after = _match_lines(match)
+    if before == after:
+        return
+
+    empty = (0, 0, 0, 0, 0.0, 0.0)
+    white, black = match.white_team_id, match.black_team_id
+    deltas = {
+        white: _delta(TEAM_FIELDS, before[0] or empty, after[0] or empty),
+        black: _delta(TEAM_FIELDS, before[1] or empty, after[1] or empty),
+    }
+    delta_mp = {team_id: d.get("match_points", 0) for team_id, d in deltas.items()}
+    changed = [team_id for team_id, d in delta_mp.items() if d]
+
+    # Opponents whose SB follows a side's match points are locked with the sides, all in id order. The
+    # matches are read again under the locks to pick up any completed while waiting for them.
+    opponents = set()
+    if changed:
+        opponents = {t for m in _other_matches(db, match, changed) for t in (m.white_team_id, m.black_team_id)}
+    old_mp = _lock_teams(db, {white, black} | opponents)
+    others = _other_matches(db, match, changed) if changed else []
+
+    # SB of this match's teams: own game points here times the opponent's match points
+    for team_id, opponent_id, old_line, new_line in ((white, black, before[0], after[0]), (black, white, before[1], after[1])):
+        old_sb = old_line[5] * old_mp[opponent_id] if old_line else 0
+        new_sb = new_line[5] * (old_mp[opponent_id] + delta_mp[opponent_id]) if new_line else 0
+        if new_sb != old_sb:
+            deltas[team_id]["sonneborn_berger"] = new_sb - old_sb
+
+    # Every other counted match against either team carries the match point change into the opponent's SB
+    for other in others:
+        for team_id, score, opponent_id in (
+            (other.white_team_id, other.white_score, other.black_team_id),
+            (other.black_team_id, other.black_score, other.white_team_id),
+        ):
+            if delta_mp.get(opponent_id):
+                team = deltas.setdefault(team_id, {})
+                team["sonneborn_berger"] = team.get("sonneborn_berger", 0) + score * delta_mp[opponent_id]
+    _increment(db, Team, deltas)
+
+def apply_game_result(db: Session, game: Game, result: MatchResult):
+    """Record one board result and apply only its delta to the match, both teams and both players."""
+    match = game.match
+    _lock_match(db, match)
+    before = _match_lines(match)
+    old_white = _player_line(game.white_score, game.is_completed)
+    old_black = _player_line(game.black_score, game.is_completed)
+
+    game.white_score, game.black_score = GAME_SCORES[result]
+    game.result = result
+    game.is_completed = result != MatchResult.pending
+
+    _increment(db, Player, {
+        game.white_player_id: _delta(PLAYER_FIELDS, old_white, _player_line(game.white_score, game.is_completed)),
+        game.black_player_id: _delta(PLAYER_FIELDS, old_black, _player_line(game.black_score, game.is_completed)),
+    })
+
+    update_match_result(match)
+    _apply_match_delta(db, match, before)
+    bump_version(db, match.tournament_id)
+    db.commit()
+
+def record_game_result(db: Session, game: Game, result: MatchResult):
+    """Record one board result and its match state only, leaving team and player totals to a deferred recompute."""
+    game.white_score, game.black_score = GAME_SCORES[result]
+    game.result = result
+    game.is_completed = result != MatchResult.pending
+    update_match_result(game.match)
+    bump_version(db, game.match.tournament_id, stats_stale=True)
+    db.commit()
+
+def apply_tiebreaker_result(db: Session, match: Match, tiebreaker: Tiebreaker):
+    _lock_match(db, match)
+    before = _match_lines(match)
+    match.tiebreaker = tiebreaker
+    update_match_result(match)
+    _apply_match_delta(db, match, before)
+    bump_version(db, match.tournament_id)
+    db.commit()
+
+def record_tiebreaker_result(db: Session, match: Match, tiebreaker: Tiebreaker):
+    """Record a tiebreaker and its match state only, leaving team totals to a deferred recompute."""
+    match.tiebreaker = tiebreaker
+    update_match_result(match)
+    bump_version(db, match.tournament_id, stats_stale=True)
+    db.commit()
+
+def apply_game_results(db: Session, entries, tournament_id: Optional[int] = None,
+                       round_number: Optional[int] = None) -> List[Dict]:
+    """
+    Validate a batch of board results, apply the valid ones in one transaction and recompute
+    the stats of each affected tournament once. Returns a status per entry, in input order.
+    """
+    match_ids = {entry.match_id for entry in entries}
+    matches = {
+        m.id: m for m in db.query(Match).options(selectinload(Match.games)).filter(Match.id.in_(match_ids)).all()
+    }
+
+    statuses = []
+    seen = set()
+    touched = {}
+    for entry in entries:
+        status = {"match_id": entry.match_id, "board_number": entry.board_number, "status": "rejected", "detail": None}
+        statuses.append(status)
+        match = matches.get(entry.match_id)
+        game = next((g for g in match.games if g.board_number == entry.board_number), None) if match else None
+        key = (entry.match_id, entry.board_number)
+        if not game:
+            status["detail"] = "Game not found"
+        elif tournament_id is not None and (match.tournament_id != tournament_id or match.round_number != round_number):
+            status["detail"] = f"Match is not part of round {round_number} of tournament {tournament_id}"
+        elif entry.result not in GAME_SCORES:
+            status["detail"] = f"Invalid result: {entry.result.value}"
+        elif key in seen:
+            status["detail"] = "Duplicate entry for this board"
+        else:
+            seen.add(key)
+            game.white_score, game.black_score = GAME_SCORES[entry.result]
+            game.result = entry.result
+            game.is_completed = entry.result != MatchResult.pending
+            touched[match.id] = match
+            status["status"] = "applied"
+
+    if touched:
+        for match in touched.values():
+            update_match_result(match)
+        db.flush()
+        for affected in {m.tournament_id for m in touched.values()}:
+            refresh_tournament_stats(db, affected)
+        db.commit()
+    return statuses
+
+def verify_tournament_stats(db: Session, tournament_id: int, repair: bool = False) -> Dict:
+    """Compare stored stats with a full recompute; keep the recomputed values only when repairing."""
+    seen_version = get_version(db, tournament_id)
+    matches = db.query(Match).options(selectinload(Match.games)).filter(
+        Match.tournament_id == tournament_id
+    ).order_by(Match.id).all()
+    stored = {("match", m.id): tuple(getattr(m, f) for f in MATCH_FIELDS) for m in matches}
+    stored.update({("team", t.id): tuple(getattr(t, f) for f in TEAM_STAT_FIELDS) for t in _tournament_teams(db, tournament_id)})
+    stored.update({("player", p.id): tuple(getattr(p, f) for f in PLAYER_FIELDS) for p in _tournament_players(db, tournament_id)})
+
+    for match in matches:
+        update_match_result(match)
+    db.flush()
+    with count_queries(db) as queries:
+        recompute_tournament_stats(db, tournament_id)
+
+    checks = (
+        [("match", m, MATCH_FIELDS) for m in matches] +
+        [("team", t, TEAM_STAT_FIELDS) for t in _tournament_teams(db, tournament_id, refresh=True)] +
+        [("player", p, PLAYER_FIELDS) for p in _tournament_players(db, tournament_id, refresh=True)]
+    )
+    mismatches: List[Dict] = []
+    for kind, obj, fields in checks:
+        for field, value in zip(fields, stored[(kind, obj.id)]):
+            expected = getattr(obj, field)
+            if value != expected:
+                mismatches.append({
+                    "type": kind,
+                    "id": obj.id,
+                    "field": field,
+                    "stored": getattr(value, "value", value),
+                    "expected": getattr(expected, "value", expected),
+                })
+
+    if repair:
+        mark_stats_recomputed(db, tournament_id, seen_version)
+        db.commit()
+    else:
+        db.rollback()
+    return {
+        "consistent": not mismatches,
+        "repaired": repair and bool(mismatches),
+        "queries": queries["count"],
+        "mismatches": mismatches,
+    }
+
+def _tournament_teams(db: Session, tournament_id: int, refresh: bool = False) -> List[Team]:
+    query = db.query(Team).filter(Team.tournament_id == tournament_id)
+    if refresh:
+        query = query.populate_existing()
+    return query.order_by(Team.id).all()
+
+def _tournament_players(db: Session, tournament_id: int, refresh: bool = False) -> List[Player]:
+    query = db.query(Player).join(Team, Player.team_id == Team.id).filter(Team.tournament_id == tournament_id)
+    if refresh:
+        query = query.populate_existing()
+    return query.order_by(Player.id).all()
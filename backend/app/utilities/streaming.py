@@ -0,0 +1,34 @@
+import os
+from functools import lru_cache
+from typing import Iterator, List, Sequence, Type
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+# Listings longer than this are streamed, this many items per chunk
+STREAM_CHUNK_ITEMS = int(os.getenv("STREAM_CHUNK_ITEMS", "200"))
+
+@lru_cache(maxsize=None)
+def _adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def _chunks(adapter: TypeAdapter, items: Sequence) -> Iterator[bytes]:
+    yield b"["
+    for start in range(0, len(items), STREAM_CHUNK_ITEMS):
+        validated = adapter.validate_python(items[start:start + STREAM_CHUNK_ITEMS], from_attributes=True)
+        # dump_json of a slice gives "[a,b,...]"; the brackets are dropped and the slices joined with commas
+        body = adapter.dump_json(validated)[1:-1]
+        yield body if start == 0 else b"," + body
+    yield b"]"
+
+def json_list(items: Sequence, model: Type[BaseModel]) -> Response:
+    """
+    A JSON array of rows validated as `model`. Long listings are validated, encoded and sent a chunk
+    at a time, so only one chunk of response models exists at once. The rows must already hold every
+    attribute the model reads: the session may be closed by the time a later chunk is validated.
+    """
+    adapter = _adapter(model)
+    if len(items) <= STREAM_CHUNK_ITEMS:
+        return Response(adapter.dump_json(adapter.validate_python(items, from_attributes=True)),
+                        media_type="application/json")
+    return StreamingResponse(_chunks(adapter, items), media_type="application/json")
@@ -0,0 +1,175 @@
+import math
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from ..models import Match
+from .score_matrix import TournamentState
+
+# Pair costs: a rematch outweighs any score difference, which outweighs colour preferences,
+# which outweigh straying from the Dutch top-half-against-bottom-half order
+REMATCH_COST = 1_000_000.0
+SCORE_COST = 1_000.0
+COLOUR_COST = 50.0
+ABSOLUTE_COLOUR_COST = 500.0
+DISTANCE_COST = 1.0
+
+# Teams further apart than this in the pairing order are never paired. Small fields are
+# matched exactly over every team; large ones only need nearby score groups.
+EXACT_LIMIT = 12
+WINDOW = 8
+
+def default_rounds(team_count: int) -> int:
+    return max(1, min(team_count - 1, math.ceil(math.log2(max(team_count, 2)))))
+
+class SwissHistory:
+    """Scores, meetings and colours of a tournament's teams, indexed by seed order."""
+
+    def __init__(self, team_ids: List[int], match_points: np.ndarray, game_points: np.ndarray,
+                 played: np.ndarray, colours: List[List[int]], byes: np.ndarray):
+        self.team_ids = team_ids
+        self.match_points = match_points
+        self.game_points = game_points
+        self.played = played
+        # +1 for white and -1 for black, in round order
+        self.colours = colours
+        self.byes = byes
+
+    @classmethod
+    def empty(cls, team_ids: List[int]) -> "SwissHistory":
+        n = len(team_ids)
+        return cls(team_ids, np.zeros(n), np.zeros(n), np.zeros((n, n), dtype=np.int64),
+                   [[] for _ in range(n)], np.zeros(n, dtype=np.int64))
+
+    @classmethod
+    def load(cls, db: Session, tournament_id: int, rounds_played: int) -> "SwissHistory":
+        state = TournamentState.load(db, tournament_id)
+        team_ids = state.team_ids.tolist()
+        index = {team_id: i for i, team_id in enumerate(team_ids)}
+        colours = [[] for _ in team_ids]
+        for white_team_id, black_team_id in db.query(Match.white_team_id, Match.black_team_id).filter(
+            Match.tournament_id == tournament_id,
+            Match.round_number <= rounds_played
+        ).order_by(Match.round_number, Match.id).all():
+            colours[index[white_team_id]].append(1)
+            colours[index[black_team_id]].append(-1)
+        byes = np.array([rounds_played - len(c) for c in colours], dtype=np.int64)
+        return cls(team_ids, state.team_match_points(), state.team_game_points(), state.played, colours, byes)
+
+    def balance(self, i: int) -> int:
+        return sum(self.colours[i])
+
+    def last_colour(self, i: int) -> int:
+        return self.colours[i][-1] if self.colours[i] else 0
+
+def pair_round(history: SwissHistory) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """
+    (white, black) team pairs for the next round and the team with the bye, if any.
+
+    Teams are ranked by match points, game points and seed, each score group is laid out
+    top half against bottom half, and a minimum-cost perfect matching is taken over that
+    order with partners at most a window apart, so rematches, score-group floats and colour
+    clashes are traded off in one pass in O(n * 2^window).
+    """
+    n = len(history.team_ids)
+    seeds = np.arange(n)
+    ranked = np.lexsort((seeds, -history.game_points, -history.match_points)).tolist()
+
+    bye = None
+    if n % 2:
+        # Lowest ranked team among those with the fewest byes
+        bye = min(reversed(ranked), key=lambda i: history.byes[i])
+        ranked.remove(bye)
+
+    order = _dutch_order(ranked, history.match_points)
+    window = len(order) if len(order) <= EXACT_LIMIT else WINDOW
+    pairs = _min_cost_pairing(len(order), window, _band_costs(order, window, history))
+
+    paired = [_assign_colours(order[a], order[b], board, history) for board, (a, b) in enumerate(sorted(pairs))]
+    return ([(history.team_ids[w], history.team_ids[b]) for w, b in paired],
+            None if bye is None else history.team_ids[bye])
+
+def _dutch_order(ranked: List[int], match_points: np.ndarray) -> List[int]:
+    """Interleave each score group's top and bottom halves so Dutch opponents sit next to each other.
+    The odd team out of a group stays last and floats down next to the group below."""
+    order = []
+    start = 0
+    while start < len(ranked):
+        end = start
+        while end < len(ranked) and match_points[ranked[end]] == match_points[ranked[start]]:
+            end += 1
+        group = ranked[start:end]
+        half = len(group) // 2
+        for top, bottom in zip(group[:half], group[half:2 * half]):
+            order += [top, bottom]
+        order += group[2 * half:]
+        start = end
+    return order
+
+def _band_costs(order: List[int], window: int, history: SwissHistory) -> List[List[float]]:
+    """costs[i][d] of pairing position i with position i + d of the pairing order."""
+    idx = np.array(order, dtype=np.int64)
+    mp = history.match_points[idx]
+    balance = np.array([history.balance(i) for i in order])
+    last = np.array([history.last_colour(i) for i in order])
+    n = len(order)
+    costs = [[0.0] * window for _ in range(n)]
+    for d in range(1, min(window, n)):
+        a, b = np.arange(n - d), np.arange(d, n)
+        same_due = (np.sign(balance[a]) == np.sign(balance[b])) & (balance[a] != 0)
+        cost = (
+            REMATCH_COST * history.played[idx[a], idx[b]]
+            + SCORE_COST * (mp[a] - mp[b]) ** 2
+            + COLOUR_COST * same_due * np.minimum(np.abs(balance[a]), np.abs(balance[b]))
+            + COLOUR_COST * ((last[a] == last[b]) & (last[a] != 0))
+            + ABSOLUTE_COLOUR_COST * (same_due & (np.abs(balance[a]) >= 2) & (np.abs(balance[b]) >= 2))
+            + DISTANCE_COST * (d - 1)
+        )
+        for i, c in enumerate(cost.tolist()):
+            costs[i][d] = c
+    return costs
+
+def _min_cost_pairing(n: int, window: int, costs: List[List[float]]) -> List[Tuple[int, int]]:
+    """
+    Exact minimum-cost perfect matching of positions 0..n-1 (n even) among matchings whose
+    partners are fewer than window positions apart. Dynamic programme over positions whose
+    state is the bitmask of the next window positions that are already taken.
+    """
+    layers: List[Dict[int, Tuple[float, int, int]]] = [{0: (0.0, 0, 0)}]
+    for i in range(n):
+        layer: Dict[int, Tuple[float, int, int]] = {}
+        reach = min(window, n - i)
+        for mask, (total, _, _) in layers[i].items():
+            if mask & 1:
+                options = ((total, mask >> 1, 0),)
+            else:
+                row = costs[i]
+                options = [
+                    (total + row[d], (mask | 1 << d) >> 1, d)
+                    for d in range(1, reach) if not mask >> d & 1
+                ]
+            for total_cost, next_mask, d in options:
+                best = layer.get(next_mask)
+                if best is None or total_cost < best[0]:
+                    layer[next_mask] = (total_cost, mask, d)
+        layers.append(layer)
+
+    pairs = []
+    mask = 0
+    for i in range(n, 0, -1):
+        _, mask, d = layers[i][mask]
+        if d:
+            pairs.append((i - 1, i - 1 + d))
+    return pairs
+
+def _assign_colours(a: int, b: int, board: int, history: SwissHistory) -> Tuple[int, int]:
+    """(white, black) for a pair: the team with more blacks gets white, then whoever had black last,
+    then the higher ranked team alternates from its last colour, or by board in the first round."""
+    balance_a, balance_b = history.balance(a), history.balance(b)
+    if balance_a != balance_b:
+        return (a, b) if balance_a < balance_b else (b, a)
+    last_a, last_b = history.last_colour(a), history.last_colour(b)
+    if last_a != last_b:
+        return (a, b) if last_a < last_b else (b, a)
+    if last_a:
+        return (b, a) if last_a > 0 else (a, b)
+    return (a, b) if board % 2 == 0 else (b, a)
@@ -0,0 +1,45 @@
+from typing import Dict, List, Optional, Sequence
+
+# Ranking keys that only a manual tiebreak can separate
+TEAM_KEYS = ("match_points", "game_points", "sonneborn_berger")
+PLAYER_KEYS = ("points", "wins")
+
+# Places whose ties must be settled by default: the podium, and the best player award
+PODIUM_PLACES = 3
+BEST_PLAYER_PLACES = 1
+
+def tie_clusters(ranked: Sequence[dict], keys: Sequence[str], id_key: str,
+                 group_key: Optional[str] = None, places: Optional[int] = None) -> List[dict]:
+    """
+    Every run of rows level on all keys, as {"group", "rank", "ids"}, from rows already in ranking
+    order (grouped first when group_key is given). One pass over adjacent rows, so the ranking sort
+    is the only super-linear step. With places, only clusters reaching into the first places ranks
+    of their group are kept; rank is the cluster's first place within its group.
+    """
+    clusters = []
+    start = group_start = 0
+    for i in range(1, len(ranked) + 1):
+        new_group = i == len(ranked) or (group_key is not None and ranked[i][group_key] != ranked[start][group_key])
+        if new_group or any(ranked[i][k] != ranked[start][k] for k in keys):
+            rank = start - group_start + 1
+            if i - start > 1 and (places is None or rank <= places):
+                clusters.append({
+                    "group": ranked[start][group_key] if group_key is not None else None,
+                    "rank": rank,
+                    "ids": [row[id_key] for row in ranked[start:i]],
+                })
+            start = i
+            if new_group:
+                group_start = i
+    return clusters
+
+def tied_with(clusters: List[dict], places: Optional[int] = None) -> Dict[Optional[int], Dict[int, List[int]]]:
+    """Per group, each member within the first places ranks mapped to the others level with it."""
+    ties: Dict[Optional[int], Dict[int, List[int]]] = {}
+    for cluster in clusters:
+        ids = cluster["ids"]
+        for offset, member in enumerate(ids):
+            if places is not None and cluster["rank"] + offset > places:
+                break
+            ties.setdefault(cluster["group"], {})[member] = [other for other in ids if other != member]
+    return ties
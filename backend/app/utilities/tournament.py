@@ -1,13 +1,20 @@
 ### backend/app/tournament_logic.py
-from typing import List
+from typing import List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, case, func, insert, select, union_all, update
+from sqlalchemy.orm import Session, selectinload
 from ..models import Tournament, Round, Match, Game, Team, Player
-from .. import schemas,crud
+from .. import schemas
 from ..enums import TournamentFormat, TournamentStage ,MatchLabel ,MatchResult, MatchLabel,Tiebreaker
+from .score_matrix import TournamentState
+from . import bracket, scheduler, snapshots, swiss, ties
+from .cache import bump_version, get_version, mark_stats_recomputed
 
 def create_tournament_structure(db: Session,data: schemas.TournamentCreate):
+    """
+    Build teams, players, rounds, matches and games in memory and persist them with one
+    batched INSERT ... RETURNING per table, all in a single transaction.
+    """
     tour = Tournament(
         name=data.name,
         description=data.description,
@@ -20,117 +27,112 @@ def create_tournament_structure(db: Session,data: schemas.TournamentCreate):
     db.add(tour)
     db.flush()  
 
-    teams = []
-    x=1
-    for j,name in enumerate(data.team_names):
-        if data.format == TournamentFormat.group_knockout:
-            tour.total_rounds=2
-            group_number = 1 if j < len(data.team_names) // 2 else 2
-        else:
-            tour.total_rounds=0
-            group_number = 1
-        team = Team(name=name, tournament_id=tour.id,group=group_number,manual_tb4=j+1)
-        db.add(team)
-        db.flush()
-        teams.append(team)
-
-        for i in range(4):
-            player = Player(
-                name=f"Player {i + 1} of {name}",
-                team_id=team.id,
-                manual_tb3=x
-            )
-            x+=1
-            db.add(player)
-
-    db.flush()
-
-    group_1_ids = [team.id for team in teams if team.group == 1]
-    group_2_ids = [team.id for team in teams if team.group == 2]
-    if len(group_1_ids) % 2 != 0:
-        group_1_ids.append(None)
-    if len(group_2_ids) % 2 != 0:
-        group_2_ids.append(None)
-    group_1_rounds = len(group_1_ids) -1
-    group_2_rounds = len(group_2_ids) -1
-    tour.total_group_stage_rounds = max(group_1_rounds, group_2_rounds)
-    tour.total_rounds+=tour.total_group_stage_rounds
-    
-    for round_num in range(1, tour.total_group_stage_rounds + 1):
-        rnd = Round(tournament_id=tour.id, round_number=round_num,stage=TournamentStage.group)
-        db.add(rnd)
-        db.flush()
-        if round_num <= group_1_rounds:
-            create_round_robin_matches_for_group(db, tour, rnd, group_1_ids,1)
-        if round_num <= group_2_rounds:
-            create_round_robin_matches_for_group(db, tour, rnd, group_2_ids,2)
-    
-    if tour.format==TournamentFormat.group_knockout:
-          create_knockout_stage_rounds(db, tour)
+    knockout = data.format == TournamentFormat.group_knockout
+    is_swiss = data.format == TournamentFormat.swiss
+    team_names = data.team_names
+    if is_swiss and data.total_rounds is not None and not 1 <= data.total_rounds < len(team_names):
+        raise ValueError(f"A Swiss tournament of {len(team_names)} teams can have 1 to {len(team_names) - 1} rounds")
+    group_count = data.group_count or (2 if knockout else 1)
+    if is_swiss and group_count != 1:
+        raise ValueError("A Swiss tournament is played as a single group")
+    if group_count < 1 or len(team_names) < 2 * group_count:
+        raise ValueError(f"{group_count} groups need at least {2 * group_count} teams")
+    # Ratings are not known yet, so teams are snaked in the order given and re-seeded on start
+    team_groups = scheduler.snake_groups([0] * len(team_names), group_count)
+    if knockout:
+        tour.knockout_size = data.knockout_size or 4
+        ko_bracket = bracket.get_bracket(tour.knockout_size, group_count)
+        ko_bracket.check_groups([team_groups.count(group_number) for group_number in range(1, group_count + 1)])
+    team_ids = _insert_returning_ids(db, Team, [
+        {"name": name, "tournament_id": tour.id, "group": group_number, "manual_tb4": j + 1}
+        for j, (name, group_number) in enumerate(zip(team_names, team_groups))
+    ])
+    player_ids = _insert_returning_ids(db, Player, [
+        {"name": f"Player {i + 1} of {name}", "team_id": team_id, "manual_tb3": 4 * j + i + 1}
+        for j, (name, team_id) in enumerate(zip(team_names, team_ids))
+        for i in range(4)
+    ])
+    lineups = {team_id: player_ids[4 * j:4 * j + 4] for j, team_id in enumerate(team_ids)}
+
+    if is_swiss:
+        # Only the first round can be paired up front; later ones are paired as rounds complete
+        tour.total_group_stage_rounds = tour.total_rounds = data.total_rounds or swiss.default_rounds(len(team_ids))
+        round_ids = _insert_returning_ids(db, Round, [
+            {"tournament_id": tour.id, "round_number": round_num, "stage": TournamentStage.group}
+            for round_num in range(1, tour.total_rounds + 1)
+        ])
+        pairs, _ = swiss.pair_round(swiss.SwissHistory.empty(team_ids))
+        _insert_matches(db, [_group_match(tour.id, round_ids[0], 1, pair) for pair in pairs], lineups)
+        db.commit()
+        return tour
+
+    groups = scheduler.padded_groups(team_ids, team_groups)
+    tour.total_group_stage_rounds = scheduler.group_stage_rounds(groups)
+    # Knockout rounds are created one at a time as their feeders finish
+    tour.total_rounds = tour.total_group_stage_rounds + (ko_bracket.rounds if knockout else 0)
+
+    round_ids = _insert_returning_ids(db, Round, [
+        {"tournament_id": tour.id, "round_number": round_num, "stage": TournamentStage.group}
+        for round_num in range(1, tour.total_group_stage_rounds + 1)
+    ])
+    matches = [
+        _group_match(tour.id, round_ids[round_num - 1], round_num, (white, black), group_number)
+        for round_num, group_number, white, black in scheduler.group_fixtures(groups)
+    ]
+    _insert_matches(db, matches, lineups)
 
     db.commit()
     return tour
 
-def create_round_robin_matches_for_group(db: Session, tournament: Tournament, rnd: Round, teams: List[int], group_number: int):
-    half = len(teams) // 2
-    round_num=rnd.round_number
-    arr = teams[:]
-    for _ in range(round_num - 1):
-        arr = [arr[0]] + [arr[-1]] + arr[1:-1]
-    
-    for i in range(half):
-        white_team_id, black_team_id = arr[i], arr[-i - 1]
-        if white_team_id is None or black_team_id is None:
-            continue
-            
-        match = Match(
-            tournament_id=tournament.id,
-            round_id=rnd.id,
-            label=MatchLabel.group,
-            round_number=round_num,
-            white_team_id=white_team_id,
-            black_team_id=black_team_id,
-            group=group_number
-        )
-        db.add(match)
-        db.flush()
-        
-        create_games_for_match(db, match)
-
-def create_knockout_stage_rounds(db: Session, tournament: Tournament):
-
-    semi_rnd_num=tournament.total_group_stage_rounds+1
-    semi_rnd = Round(tournament_id=tournament.id, round_number=semi_rnd_num,stage=TournamentStage.semi_final)
-    db.add(semi_rnd)
-    db.flush()
+def _group_match(tournament_id: int, round_id: int, round_num: int, pair: Tuple[int, int], group_number: int = 1) -> dict:
+    return {
+        "tournament_id": tournament_id,
+        "round_id": round_id,
+        "label": MatchLabel.group,
+        "round_number": round_num,
+        "white_team_id": pair[0],
+        "black_team_id": pair[1],
+        "group": group_number,
+    }
 
-    for i in range(2):
-        match = Match(
-            tournament_id=tournament.id,
-            round_id=semi_rnd.id,
-            round_number=semi_rnd_num,
-            label=MatchLabel.SF1 if i==0 else MatchLabel.SF2,
-            white_team_id=None,
-            black_team_id=None,
-            group=0
-        )
-        db.add(match)
-    final_rnd_num=tournament.total_group_stage_rounds+2
-    final_rnd = Round(tournament_id=tournament.id, round_number=final_rnd_num,stage=TournamentStage.final)
-    db.add(final_rnd)
+def _insert_matches(db: Session, matches: List[dict], lineups: dict):
+    """Insert match rows and, for those with both teams known, one game per board of the lineups."""
+    match_ids = _insert_returning_ids(db, Match, matches)
+    games = [
+        {"match_id": match_id, "board_number": board_num, "white_player_id": wp, "black_player_id": bp}
+        for match_id, match in zip(match_ids, matches)
+        if match["white_team_id"] and match["black_team_id"]
+        for board_num, (wp, bp) in enumerate(zip(lineups[match["white_team_id"]], lineups[match["black_team_id"]]), start=1)
+    ]
+    if games:
+        db.execute(insert(Game), games)
+
+def create_swiss_round(db: Session, tournament_id: int, round_number: int):
+    """Pair a Swiss round from the results of the rounds before it and insert its matches and games."""
+    round_obj = db.query(Round).filter(Round.tournament_id == tournament_id, Round.round_number == round_number).first()
+    if not round_obj or db.query(Match.id).filter(Match.round_id == round_obj.id).first():
+        return
     db.flush()
-    
-    for i in range(2):
-        match = Match(
-            tournament_id=tournament.id,
-            round_id=final_rnd.id,
-            round_number=final_rnd_num,
-            label=MatchLabel.Final if i==1 else MatchLabel.Place3rd,
-            white_team_id=None,
-            black_team_id=None,
-            group=0
-        )
-        db.add(match)
+    pairs, _ = swiss.pair_round(swiss.SwissHistory.load(db, tournament_id, round_number - 1))
+    _insert_matches(db, [_group_match(tournament_id, round_obj.id, round_number, pair) for pair in pairs],
+                    _team_lineups(db, tournament_id))
+
+def _team_lineups(db: Session, tournament_id: int) -> dict:
+    """The four players of each team by board; boards follow player order, as for the rounds created with the tournament."""
+    lineups = {}
+    for player_id, team_id in db.query(Player.id, Player.team_id).join(Team, Player.team_id == Team.id).filter(
+        Team.tournament_id == tournament_id
+    ).order_by(Player.id).all():
+        lineup = lineups.setdefault(team_id, [])
+        if len(lineup) < 4:
+            lineup.append(player_id)
+    return lineups
+
+def _insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    """Batched insert of plain row dicts, returning primary keys in the order the rows were given."""
+    if not rows:
+        return []
+    return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
 
 def create_games_for_match(db: Session, match: Match):
     if match.white_team_id and match.black_team_id :
@@ -152,157 +154,237 @@ def start_tournament(db: Session, tournament_id: int) -> bool:
         return False
     if tournament.stage != TournamentStage.not_yet_started:
         return False
+    if tournament.format != TournamentFormat.swiss:
+        reseed_groups(db, tournament_id)
     tournament.stage =TournamentStage.group
     tournament.current_round = 1
     db.commit()
     return True
 
+def reseed_groups(db: Session, tournament_id: int) -> bool:
+    """
+    Snake-seed the teams into their groups by average player rating, now that rosters are final,
+    and rebuild the group fixtures if any team moved. Returns whether the groups changed.
+    """
+    rows = db.query(Team.id, Team.group, func.avg(Player.rating)).outerjoin(Player, Player.team_id == Team.id).filter(
+        Team.tournament_id == tournament_id
+    ).group_by(Team.id, Team.group).order_by(Team.id).all()
+    group_count = len({group_number for _, group_number, _ in rows})
+    if group_count < 2:
+        return False
+    groups = scheduler.snake_groups([float(rating or 0) for _, _, rating in rows], group_count)
+    if groups == [group_number for _, group_number, _ in rows]:
+        return False
 
-def recalculate_round_stats(db: Session, tournament_id: int, round_number: int):
+    team_ids = [team_id for team_id, _, _ in rows]
+    db.execute(update(Team), [{"id": team_id, "group": group_number} for team_id, group_number in zip(team_ids, groups)])
+    group_matches = select(Match.id).filter(Match.tournament_id == tournament_id, Match.label == MatchLabel.group)
+    db.query(Game).filter(Game.match_id.in_(group_matches)).delete(synchronize_session=False)
+    db.query(Match).filter(Match.id.in_(group_matches)).delete(synchronize_session=False)
+
+    round_ids = dict(db.query(Round.round_number, Round.id).filter(Round.tournament_id == tournament_id).all())
+    _insert_matches(db, [
+        _group_match(tournament_id, round_ids[round_num], round_num, (white, black), group_number)
+        for round_num, group_number, white, black in scheduler.group_fixtures(scheduler.padded_groups(team_ids, groups))
+    ], _team_lineups(db, tournament_id))
+    bump_version(db, tournament_id)
+    return True
+
+
+def update_match_result(match: Match):
+    if match.games:
+        match.white_score = sum(g.white_score for g in match.games)
+        match.black_score = sum(g.black_score for g in match.games)
+        
+        if match.white_score+match.black_score==4:
+            match.is_completed = True
+            if match.white_score > match.black_score:
+                match.result = MatchResult.white_win
+                match.tiebreaker=Tiebreaker.no_tiebreaker
+            elif match.black_score > match.white_score:
+                match.result = MatchResult.black_win
+                match.tiebreaker=Tiebreaker.no_tiebreaker
+            else:
+                if match.label!= MatchLabel.group:
+                    match.result=MatchResult.tiebreaker
+                    if match.tiebreaker==Tiebreaker.no_tiebreaker or match.tiebreaker==Tiebreaker.pending:
+                        match.tiebreaker=Tiebreaker.pending
+                        match.is_completed=False
+                    else:
+                        # Tiebreaker has been resolved (white_win or black_win)
+                        match.is_completed=True
+                else:
+                    match.result = MatchResult.draw
+        else:
+            match.is_completed = False
+            match.result = MatchResult.pending
 
+def _refresh_round_matches(db: Session, tournament_id: int, round_number: int) -> bool:
     round= db.query(Round).filter(Round.tournament_id == tournament_id,Round.round_number==round_number).first()
     if not round:
-        return
+        return False
 
-    for match in round.matches:
-        if match.games:
-            match.white_score = sum(g.white_score for g in match.games)
-            match.black_score = sum(g.black_score for g in match.games)
-            
-            if match.white_score+match.black_score==4:
-                match.is_completed = True
-                if match.white_score > match.black_score:
-                    match.result = MatchResult.white_win
-                    match.tiebreaker=Tiebreaker.no_tiebreaker
-                elif match.black_score > match.white_score:
-                    match.result = MatchResult.black_win
-                    match.tiebreaker=Tiebreaker.no_tiebreaker
-                else:
-                    if match.label!= MatchLabel.group:
-                        match.result=MatchResult.tiebreaker
-                        if match.tiebreaker==Tiebreaker.no_tiebreaker or match.tiebreaker==Tiebreaker.pending:
-                            match.tiebreaker=Tiebreaker.pending
-                            match.is_completed=False
-                        else:
-                            # Tiebreaker has been resolved (white_win or black_win)
-                            match.is_completed=True
-                    else:
-                        match.result = MatchResult.draw
-            else:
-                match.is_completed = False
-                match.result = MatchResult.pending
+    matches = db.query(Match).options(selectinload(Match.games)).filter(Match.round_id == round.id).all()
+    for match in matches:
+        update_match_result(match)
+    db.flush()
+    return True
 
+def recalculate_round_stats(db: Session, tournament_id: int, round_number: int):
+    if not _refresh_round_matches(db, tournament_id, round_number):
+        return
+
+    refresh_tournament_stats(db, tournament_id)
     db.commit()
 
-    tournament_teams = db.query(Team).filter(Team.tournament_id == tournament_id).all()
-    for team in tournament_teams:
+def record_round_change(db: Session, tournament_id: int, round_number: int):
+    """Refresh a round's match states after a lineup or colour change, leaving totals to a deferred recompute."""
+    if not _refresh_round_matches(db, tournament_id, round_number):
+        return
 
-        team.match_points = 0
-        team.game_points = 0
-        team.wins = 0
-        team.draws = 0
-        team.losses = 0
-        
-        white_matches = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.white_team_id == team.id,
-            Match.is_completed == True,
-            Match.label == MatchLabel.group
-        ).all()
-        
-        black_matches = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.black_team_id == team.id,
-            Match.is_completed == True,
-            Match.label == MatchLabel.group
-        ).all()
-        team.matches_played = len(white_matches) + len(black_matches)
-
-        for match in white_matches:
-            team.game_points += match.white_score
-            if match.result == MatchResult.white_win or (match.result == MatchResult.tiebreaker and match.tiebreaker == Tiebreaker.white_win):
-                team.match_points += 2
-                team.wins += 1
-            elif match.result == MatchResult.draw:
-                team.match_points += 1
-                team.draws += 1
-            else:
-                team.losses += 1
-        
-        for match in black_matches:
-            team.game_points += match.black_score
-            if match.result == MatchResult.black_win or (match.result == MatchResult.tiebreaker and match.tiebreaker == Tiebreaker.black_win):
-                team.match_points += 2
-                team.wins += 1
-            elif match.result == MatchResult.draw:
-                team.match_points += 1
-                team.draws += 1
-            else:
-                team.losses += 1
+    bump_version(db, tournament_id, stats_stale=True)
+    db.commit()
 
-    for team in tournament_teams:
-        team.sonneborn_berger = 0
-        
-        white_matches = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.white_team_id == team.id,
-            Match.is_completed == True,
-            Match.label == MatchLabel.group
-        ).all()
-        black_matches = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.black_team_id == team.id,
-            Match.is_completed == True,
-            Match.label == MatchLabel.group
-        ).all()
-
-        for match in white_matches:
-            opponent_team = db.query(Team).filter(Team.id == match.black_team_id).first()
-            team.sonneborn_berger += match.white_score * opponent_team.match_points
-
-        for match in black_matches:
-            opponent_team = db.query(Team).filter(Team.id == match.white_team_id).first()
-            team.sonneborn_berger += match.white_score * opponent_team.match_points
-
-    tournament_players = db.query(Player).join(Team, Player.team_id == Team.id).filter(Team.tournament_id == tournament_id).all()
-    for player in tournament_players:
-        player.points = 0
-        player.wins = 0
-        player.draws = 0
-        player.losses = 0
-        
-        white_games = db.query(Game).join(Match).filter(
-            Match.tournament_id == tournament_id,
-            Game.white_player_id == player.id,
-            Game.result.isnot(None)
-        ).all()
-        
-        black_games = db.query(Game).join(Match).filter(
-            Match.tournament_id == tournament_id,
-            Game.black_player_id == player.id,
-            Game.result.isnot(None)
-        ).all()
-        
-        for game in white_games:
-            player.points += game.white_score
-            if game.white_score == 1:
-                player.wins += 1
-            elif game.white_score == 0.5:
-                player.draws += 1
-            else:
-                player.losses += 1
-        
-        for game in black_games:
-            player.points += game.black_score
-            if game.black_score == 1:
-                player.wins += 1
-            elif game.black_score == 0.5:
-                player.draws += 1
-            else:
-                player.losses += 1
-        player.games_played = len(white_games) + len(black_games)
+def refresh_tournament_stats(db: Session, tournament_id: int):
+    """Full recompute that also records the stats as current for the version it started from."""
+    seen_version = get_version(db, tournament_id)
+    recompute_tournament_stats(db, tournament_id)
+    mark_stats_recomputed(db, tournament_id, seen_version)
 
+def ensure_stats_current(db: Session, tournament_id: int) -> bool:
+    """Recompute and commit a tournament's totals if deferred writes left them behind. Returns whether it had to."""
+    row = db.query(Tournament.version, Tournament.stats_version).filter(Tournament.id == tournament_id).first()
+    if not row or row.stats_version >= row.version:
+        return False
+    refresh_tournament_stats(db, tournament_id)
     db.commit()
+    return True
+
+def recompute_tournament_stats(db: Session, tournament_id: int):
+    """Re-derive every team and player total of a tournament from its matches and games.
+
+    Runs as two set-based UPDATE ... FROM statements over grouped aggregates; nothing is
+    committed and ORM objects already loaded in the session are not refreshed.
+    """
+    stats = _team_stats_query(tournament_id)
+    db.execute(
+        update(Team)
+        .where(Team.id == stats.c.team_id)
+        .values(
+            matches_played=stats.c.matches_played,
+            wins=stats.c.wins,
+            draws=stats.c.draws,
+            losses=stats.c.losses,
+            match_points=stats.c.match_points,
+            game_points=stats.c.game_points,
+            sonneborn_berger=stats.c.sonneborn_berger,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    stats = _player_stats_query(tournament_id)
+    db.execute(
+        update(Player)
+        .where(Player.id == stats.c.player_id)
+        .values(
+            games_played=stats.c.games_played,
+            wins=stats.c.wins,
+            draws=stats.c.draws,
+            losses=stats.c.losses,
+            points=stats.c.points,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def _team_stats_query(tournament_id: int):
+    """Per-team totals and Sonneborn-Berger over completed group matches, one row per team."""
+    white_win = or_(Match.result == MatchResult.white_win,
+                    and_(Match.result == MatchResult.tiebreaker, Match.tiebreaker == Tiebreaker.white_win))
+    black_win = or_(Match.result == MatchResult.black_win,
+                    and_(Match.result == MatchResult.tiebreaker, Match.tiebreaker == Tiebreaker.black_win))
+    draw = Match.result == MatchResult.draw
+    counted = and_(Match.tournament_id == tournament_id, Match.is_completed == True, Match.label == MatchLabel.group)
+
+    sides = union_all(
+        select(
+            Match.white_team_id.label("team_id"),
+            Match.black_team_id.label("opponent_id"),
+            Match.white_score.label("game_points"),
+            case((white_win, 1), else_=0).label("win"),
+            case((draw, 1), else_=0).label("draw"),
+            case((white_win, 2.0), (draw, 1.0), else_=0.0).label("match_points"),
+        ).where(counted),
+        select(
+            Match.black_team_id,
+            Match.white_team_id,
+            Match.black_score,
+            case((black_win, 1), else_=0),
+            case((draw, 1), else_=0),
+            case((black_win, 2.0), (draw, 1.0), else_=0.0),
+        ).where(counted),
+    ).subquery("sides")
+
+    totals = select(
+        sides.c.team_id,
+        func.count().label("matches_played"),
+        func.sum(sides.c.win).label("wins"),
+        func.sum(sides.c.draw).label("draws"),
+        func.sum(sides.c.match_points).label("match_points"),
+        func.sum(sides.c.game_points).label("game_points"),
+    ).group_by(sides.c.team_id).subquery("totals")
+
+    opponent = totals.alias("opponent")
+    sb = select(
+        sides.c.team_id,
+        func.sum(sides.c.game_points * opponent.c.match_points).label("sonneborn_berger"),
+    ).join(opponent, opponent.c.team_id == sides.c.opponent_id).group_by(sides.c.team_id).subquery("sb")
+
+    played = func.coalesce(totals.c.matches_played, 0)
+    wins = func.coalesce(totals.c.wins, 0)
+    draws = func.coalesce(totals.c.draws, 0)
+    return select(
+        Team.id.label("team_id"),
+        played.label("matches_played"),
+        wins.label("wins"),
+        draws.label("draws"),
+        (played - wins - draws).label("losses"),
+        func.coalesce(totals.c.match_points, 0.0).label("match_points"),
+        func.coalesce(totals.c.game_points, 0.0).label("game_points"),
+        func.coalesce(sb.c.sonneborn_berger, 0.0).label("sonneborn_berger"),
+    ).outerjoin(totals, totals.c.team_id == Team.id).outerjoin(sb, sb.c.team_id == Team.id).where(
+        Team.tournament_id == tournament_id
+    ).subquery("team_stats")
+
+def _player_stats_query(tournament_id: int):
+    """Per-player totals over completed games of the tournament, one row per player."""
+    completed = and_(Match.tournament_id == tournament_id, Game.is_completed == True)
+    sides = union_all(
+        select(Game.white_player_id.label("player_id"), Game.white_score.label("score"))
+        .join(Match, Game.match_id == Match.id).where(completed),
+        select(Game.black_player_id, Game.black_score)
+        .join(Match, Game.match_id == Match.id).where(completed),
+    ).subquery("player_sides")
+
+    totals = select(
+        sides.c.player_id,
+        func.count().label("games_played"),
+        func.sum(case((sides.c.score == 1, 1), else_=0)).label("wins"),
+        func.sum(case((sides.c.score == 0.5, 1), else_=0)).label("draws"),
+        func.sum(sides.c.score).label("points"),
+    ).group_by(sides.c.player_id).subquery("player_totals")
+
+    played = func.coalesce(totals.c.games_played, 0)
+    wins = func.coalesce(totals.c.wins, 0)
+    draws = func.coalesce(totals.c.draws, 0)
+    return select(
+        Player.id.label("player_id"),
+        played.label("games_played"),
+        wins.label("wins"),
+        draws.label("draws"),
+        (played - wins - draws).label("losses"),
+        func.coalesce(totals.c.points, 0.0).label("points"),
+    ).join(Team, Player.team_id == Team.id).outerjoin(totals, totals.c.player_id == Player.id).where(
+        Team.tournament_id == tournament_id
+    ).subquery("player_stats")
 
 def complete_round(db: Session, tournament_id: int, round_number: int) -> bool:
 
@@ -321,29 +403,28 @@ def complete_round(db: Session, tournament_id: int, round_number: int) -> bool:
     ).first()
 
     round_obj.is_completed = True
+    snapshots.snapshot_round(db, tournament_id, round_number)
 
     if round_number==tournament.total_group_stage_rounds:
         if not check_standings_tie(db,tournament_id):
             tournament.group_standings_validated=True
-        if tournament.format==TournamentFormat.round_robin:
+        if tournament.format in (TournamentFormat.round_robin, TournamentFormat.swiss):
             if not check_best_players_tie(db,tournament_id):
                 tournament.best_players_validated=True
         elif tournament.format==TournamentFormat.group_knockout:
             if tournament.group_standings_validated:
-                tournament.stage=TournamentStage.semi_final
-                populate_knockout_matches(db,tournament_id)
-                tournament.current_round+=1
-
-    elif round_number==tournament.total_group_stage_rounds+1:
-        tournament.stage=TournamentStage.final
-        populate_knockout_matches(db,tournament_id)
-        tournament.current_round+=1
+                advance_knockout(db, tournament)
 
-    elif round_number==tournament.total_group_stage_rounds+2:
+    elif round_number==tournament.total_rounds:
         if not check_best_players_tie(db,tournament_id):
                 tournament.best_players_validated=True
 
+    elif round_number>tournament.total_group_stage_rounds:
+        advance_knockout(db, tournament)
+
     else:
+        if tournament.format == TournamentFormat.swiss:
+            create_swiss_round(db, tournament_id, round_number + 1)
         tournament.current_round +=1
     complete_tournament(db,tournament_id)
     
@@ -392,162 +473,89 @@ def complete_tournament(db: Session, tournament_id: int) -> bool:
         tournament.stage = TournamentStage.completed
     db.commit()
 
-def populate_knockout_matches(db: Session, tournament_id: int):
-
-    tour = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-    if not tour or tour.format != TournamentFormat.group_knockout:
-        return
-
-    if tour.stage == TournamentStage.semi_final:
-        existing_sf = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.label.in_([MatchLabel.SF1, MatchLabel.SF2])
-        ).all()
-        if not existing_sf:
-            return  
-        if all(m.white_team_id is not None and m.black_team_id is not None for m in existing_sf):
-            return 
-
-        standings=crud.calculate_standings(db,tournament_id)
-        group2_start_index = None
-        for idx, team in enumerate(standings):
-            if team["group"]==2:
-                group2_start_index = idx
-                break
-        
-        if group2_start_index is None or group2_start_index + 1 >= len(standings):
-            return  # Not enough teams in group 2
-
-        g1_first, g1_second = standings[0],standings[1]
-        g2_first, g2_second = standings[group2_start_index],standings[group2_start_index+1]
-
-        sf1 = existing_sf[0]
-        sf2 = existing_sf[1]
-        if sf1.label==MatchLabel.SF2:
-            sf1,sf2=sf2,sf1
-        sf1.white_team_id = g1_first["team_id"]
-        sf1.black_team_id = g2_second["team_id"]
-        if not sf1.games:
-            create_games_for_match(db, sf1)
-        sf2.white_team_id = g2_first["team_id"]
-        sf2.black_team_id = g1_second["team_id"]
-        if not sf2.games:
-            create_games_for_match(db, sf2)
-
-    elif tour.stage == TournamentStage.final:
-        sf_matches = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.label.in_([MatchLabel.SF1, MatchLabel.SF2])
-        ).all()
-        sf1=sf_matches[0]
-        sf2=sf_matches[1]
-        if sf1.label==MatchLabel.SF2:
-            sf1,sf2=sf2,sf1
-
-        final_matches = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.label.in_([MatchLabel.Final, MatchLabel.Place3rd])
-        ).all()
-        if not final_matches:
-            return  
-        if all(m.white_team_id is not None and m.black_team_id is not None for m in final_matches):
-            return 
-
-        def winner_loser(match: Match):
-            if match.result == MatchResult.white_win:
-                return match.white_team_id, match.black_team_id
-            if match.result == MatchResult.black_win:
-                return match.black_team_id, match.white_team_id
-            if match.result == MatchResult.tiebreaker:
-                if match.tiebreaker == Tiebreaker.white_win:
-                    return match.white_team_id, match.black_team_id
-                if match.tiebreaker == Tiebreaker.black_win:
-                    return match.black_team_id, match.white_team_id
-
-        place3rd_match = final_matches[0]
-        final_match = final_matches[1]
-        if final_match.label!=MatchLabel.Final:
-            final_match,place3rd_match=place3rd_match,final_match
-        w1, l1 = winner_loser(sf1)
-        w2, l2 = winner_loser(sf2)
-
-        final_match.white_team_id = w1
-        final_match.black_team_id = w2
-        if not final_match.games:
-            create_games_for_match(db, final_match)
-
-        place3rd_match.white_team_id = l1
-        place3rd_match.black_team_id = l2
-        if not place3rd_match.games:
-            create_games_for_match(db, place3rd_match)
+def knockout_bracket(db: Session, tournament: Tournament) -> bracket.Bracket:
+    group_count = db.query(func.max(Team.group)).filter(Team.tournament_id == tournament.id).scalar()
+    return bracket.get_bracket(tournament.knockout_size or 4, group_count or 1)
+
+def advance_knockout(db: Session, tournament: Tournament):
+    """Move a group + knockout tournament on to its next knockout round, creating that round's matches."""
+    ko_bracket = knockout_bracket(db, tournament)
+    knockout_round = tournament.current_round - tournament.total_group_stage_rounds + 1
+    create_knockout_round(db, tournament, ko_bracket, knockout_round)
+    tournament.stage = ko_bracket.stage(knockout_round)
+    tournament.current_round += 1
+
+def create_knockout_round(db: Session, tournament: Tournament, ko_bracket: bracket.Bracket, knockout_round: int):
+    """
+    Create one knockout round with its teams filled in from the bracket feeders: group placings for
+    the first round, the results of the feeding matches after that. Placeholder matches of
+    tournaments created before brackets were lazy are filled in place.
+    """
+    round_number = tournament.total_group_stage_rounds + knockout_round
+    bracket_matches = ko_bracket.round_matches(knockout_round)
+
+    placings, best, results = {}, {}, {}
+    if knockout_round == 1:
+        standings = TournamentState.load(db, tournament.id).standings()
+        placings, best = bracket.placings(standings, ko_bracket.ranks_needed)
+    else:
+        feeder_slots = {f.ref for m in bracket_matches for f in (m.white, m.black)}
+        for match in db.query(Match).filter(Match.tournament_id == tournament.id, Match.bracket_slot.in_(feeder_slots)):
+            results[match.bracket_slot] = _winner_loser(match)
+    teams = {
+        m.slot: (ko_bracket.resolve(m.white, placings, best, results), ko_bracket.resolve(m.black, placings, best, results))
+        for m in bracket_matches
+    }
 
+    round_obj = db.query(Round).filter(Round.tournament_id == tournament.id, Round.round_number == round_number).first()
+    if round_obj is None:
+        round_obj = Round(tournament_id=tournament.id, round_number=round_number, stage=ko_bracket.stage(knockout_round))
+        db.add(round_obj)
+        db.flush()
+    existing = {m.label: m for m in db.query(Match).filter(Match.round_id == round_obj.id)}
+
+    new_matches = []
+    for m in bracket_matches:
+        white_team_id, black_team_id = teams[m.slot]
+        match = existing.get(m.label) if m.label != MatchLabel.knockout else None
+        if match is None:
+            new_matches.append({
+                "tournament_id": tournament.id,
+                "round_id": round_obj.id,
+                "label": m.label,
+                "round_number": round_number,
+                "white_team_id": white_team_id,
+                "black_team_id": black_team_id,
+                "group": 0,
+                "bracket_slot": m.slot,
+            })
+        elif match.white_team_id is None or match.black_team_id is None:
+            match.white_team_id, match.black_team_id, match.bracket_slot = white_team_id, black_team_id, m.slot
+            if not match.games:
+                create_games_for_match(db, match)
+    _insert_matches(db, new_matches, _team_lineups(db, tournament.id))
     db.flush()
 
-
-
-def check_standings_tie(db: Session, tournament_id: int) -> dict:
-
-    tournament = db.query(Tournament).filter(Tournament.id==tournament_id).first()
-    teams = db.query(Team).filter(Team.tournament_id == tournament_id).order_by(
-        desc(Team.match_points),
-        desc(Team.game_points), 
-        desc(Team.sonneborn_berger),
-        (Team.manual_tb4)
-    ).all()
-
-    groups = {}
-    for team in teams:
-        group = team.group
-        if group not in groups:
-            groups[group] = []
-        groups[group].append(team)
-    ties_found = {}
-    teams_to_check = 2 if tournament.format == TournamentFormat.group_knockout else 3
-    
-    for group_name, group_teams in groups.items():
-        tied_teams = {}
-        for i in range(min(len(group_teams),teams_to_check)):
-            tied_with=[]
-            for j in range(len(group_teams)):
-                if i==j:
-                    continue
-                team1 = group_teams[i]
-                team2 = group_teams[j]
-                
-                if (team1.match_points == team2.match_points and
-                    team1.game_points == team2.game_points and
-                    team1.sonneborn_berger == team2.sonneborn_berger):
-                    tied_with.append(team2.id)
-            if tied_with:
-                tied_teams[team1.id] = tied_with
-        
-        if tied_teams:
-            ties_found[group_name] = tied_teams
-
-    return ties_found
-
-def check_best_players_tie(db: Session, tournament_id: int) -> dict:
-    
-    tournament_players = db.query(Player).filter(
-        Player.team_id.in_(
-            db.query(Team.id).filter(Team.tournament_id == tournament_id)
-        )
-    ).order_by(
-        desc(Player.points),
-        desc(Player.wins),
-        (Player.manual_tb3)
-    ).all()
-    
-    top_player = tournament_players[0]
-    tied_players = []
-
-    for player in tournament_players[1:]:
-        if (player.points == top_player.points and
-            player.wins == top_player.wins):
-            tied_players.append(player.id)
-        else:
-            break  
-    if tied_players:
-        return {top_player.id:tied_players}
-    else:
-        return {}
\ No newline at end of file
+def _winner_loser(match: Match) -> Optional[Tuple[int, int]]:
+    if match.result == MatchResult.white_win:
+        return match.white_team_id, match.black_team_id
+    if match.result == MatchResult.black_win:
+        return match.black_team_id, match.white_team_id
+    if match.result == MatchResult.tiebreaker:
+        if match.tiebreaker == Tiebreaker.white_win:
+            return match.white_team_id, match.black_team_id
+        if match.tiebreaker == Tiebreaker.black_win:
+            return match.black_team_id, match.white_team_id
+    return None
+
+def check_standings_tie(db: Session, tournament_id: int, places: Optional[int] = None) -> dict:
+    """Ties within the places that must be settled: the knockout qualifiers, otherwise the podium."""
+    if places is None:
+        tournament = db.query(Tournament).filter(Tournament.id==tournament_id).first()
+        places = ties.PODIUM_PLACES
+        if tournament.format == TournamentFormat.group_knockout:
+            places = knockout_bracket(db, tournament).ranks_needed
+    return TournamentState.load(db, tournament_id).standings_ties(places)
+
+def check_best_players_tie(db: Session, tournament_id: int, places: Optional[int] = None) -> dict:
+    return TournamentState.load(db, tournament_id).best_players_ties(places or ties.BEST_PLAYER_PLACES)
@@ -0,0 +1,124 @@
+"""
+Benchmark ChessHub on synthetic tournaments.
+
+    python -m benchmarks --sizes 8 32 128 --output baseline.json
+    python -m benchmarks --sizes 8 32 128 --compare baseline.json
+
+Runs against a throwaway SQLite file unless --database-url points at a scratch Postgres.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+FORMATS = ("round_robin", "group_knockout", "swiss")
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 128],
+                        help="team counts to benchmark (8 to 1000)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file in a temp directory")
+    parser.add_argument("--http-results", type=int, default=32,
+                        help="board results per round submitted through the API, the rest are bulk-filled")
+    parser.add_argument("--repeat", type=int, default=20, help="samples per public GET endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc peak memory tracking")
+    parser.add_argument("--output", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="p50 slowdown ratio reported as a regression")
+    args = parser.parse_args()
+    for size in args.sizes:
+        if not 8 <= size <= 1000:
+            parser.error(f"team count {size} is outside 8..1000")
+    return args
+
+def print_report(results: dict):
+    header = f"{'step':<62} {'n':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'sql avg':>8} {'sql max':>8} {'peak KB':>9}"
+    for run, steps in results["runs"].items():
+        print(f"\n== {run}")
+        print(header)
+        for step, s in steps.items():
+            peak = "-" if s["peak_kb"] is None else f"{s['peak_kb']:.1f}"
+            print(f"{step:<62} {s['samples']:>5} {s['p50_ms']:>9.2f} {s['p90_ms']:>9.2f} {s['p99_ms']:>9.2f} "
+                  f"{s['statements_mean']:>8.1f} {s['statements_max']:>8} {peak:>9}")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    print(f"\n== compared with baseline from {baseline.get('created_at', 'unknown')}")
+    for run, steps in results["runs"].items():
+        base_steps = baseline.get("runs", {}).get(run)
+        if not base_steps:
+            continue
+        for step, s in steps.items():
+            base = base_steps.get(step)
+            if not base:
+                continue
+            ratio = s["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+            flags = []
+            if ratio > tolerance:
+                flags.append(f"p50 x{ratio:.2f}")
+            if s["statements_max"] > base["statements_max"]:
+                flags.append(f"sql {base['statements_max']} -> {s['statements_max']}")
+            marker = "REGRESSION " + ", ".join(flags) if flags else ""
+            print(f"{run:<22} {step:<62} {base['p50_ms']:>9.2f} -> {s['p50_ms']:>9.2f} ms  {marker}")
+            if flags:
+                regressions.append((run, step, flags))
+    return regressions
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="chesshub-bench-"), "bench.db")
+    # app.database builds its engine at import time
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DEBUG", "true")
+    # Stats are recomputed inline, so no background recompute lands in another step's statement count
+    os.environ["DEFER_STATS"] = "false"
+
+    from app.enums import TournamentFormat
+    from app.utilities.stats import RECOMPUTE_QUERY_BUDGET
+    from . import runner
+
+    if not args.no_memory:
+        tracemalloc.start()
+    runner.prepare_database()
+
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "database": database_url.split(":", 1)[0],
+        "settings": {k: getattr(args, k) for k in ("sizes", "formats", "http_results", "repeat", "seed")},
+        "runs": {},
+    }
+    for format in args.formats:
+        for size in args.sizes:
+            print(f"running {format} with {size} teams...", file=sys.stderr)
+            results["runs"][f"{format}/{size}"] = runner.run_lifecycle(
+                TournamentFormat(format), size, http_results=args.http_results, repeat=args.repeat,
+                seed=args.seed, track_memory=not args.no_memory
+            )
+
+    print_report(results)
+    failed = False
+    for run, steps in results["runs"].items():
+        recompute = steps.get("recompute_tournament_stats")
+        if recompute and recompute["statements_max"] > RECOMPUTE_QUERY_BUDGET:
+            print(f"\n{run}: recompute_tournament_stats issued {recompute['statements_max']} statements "
+                  f"(budget {RECOMPUTE_QUERY_BUDGET})")
+            failed = True
+
+    if args.compare:
+        with open(args.compare) as f:
+            failed = bool(compare(results, json.load(f), args.tolerance)) or failed
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nbaseline written to {args.output}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
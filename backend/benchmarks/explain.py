@@ -0,0 +1,154 @@
+"""
+Check that the hot query paths use indexes.
+
+    python -m benchmarks.explain --tournaments 20 --teams 64
+    python -m benchmarks.explain --database-url postgresql://localhost/chesshub_scratch
+
+Seeds a large synthetic database, refreshes planner statistics, runs EXPLAIN on every hot query
+and exits non-zero if any of them falls back to a sequential scan of a table, or if a query
+meant to read its rows in index order sorts them instead.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.explain", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file in a temp directory")
+    parser.add_argument("--tournaments", type=int, default=20, help="synthetic round-robin tournaments to seed")
+    parser.add_argument("--teams", type=int, default=64, help="teams per tournament")
+    parser.add_argument("--announcements", type=int, default=50, help="announcements per tournament")
+    return parser.parse_args()
+
+def seed(tournaments: int, teams: int, announcements: int):
+    from sqlalchemy import insert
+    from app import crud
+    from app.database import SessionLocal
+    from app.enums import TournamentFormat
+    from app.models import Announcement
+    from . import synthetic
+
+    db = SessionLocal()
+    try:
+        for t in range(tournaments):
+            tour = crud.create_tournament(db, synthetic.tournament_payload(TournamentFormat.round_robin, teams))
+            db.execute(insert(Announcement), [
+                {"tournament_id": tour.id, "title": f"Notice {i}", "content": "Synthetic", "is_pinned": i % 10 == 0}
+                for i in range(announcements)
+            ])
+            db.commit()
+            print(f"seeded tournament {t + 1}/{tournaments}", file=sys.stderr)
+    finally:
+        db.close()
+
+# Paged in an index's order, so a page reads only its own rows; a sort step means the ORDER BY drifted from the index
+INDEX_ORDERED = {"top standings", "announcements"}
+
+def hot_queries(db) -> Dict[str, object]:
+    """The filters behind the public endpoints and the stats, pairing and bracket code, on one sample row each."""
+    from sqlalchemy import select
+    from app import crud
+    from app.enums import MatchLabel
+    from app.models import Announcement, Game, Match, Player, Round, Team
+
+    match = db.scalars(select(Match).order_by(Match.id.desc()).limit(1)).one()
+    game = db.scalars(select(Game).filter(Game.match_id == match.id).limit(1)).one()
+    tid = match.tournament_id
+    return {
+        "matches of a round": select(Match).filter(Match.tournament_id == tid, Match.round_number == match.round_number),
+        "matches of a round by id": select(Match).filter(Match.round_id == match.round_id),
+        "completed group matches as white": select(Match).filter(
+            Match.tournament_id == tid, Match.white_team_id == match.white_team_id,
+            Match.is_completed == True, Match.label == MatchLabel.group),
+        "completed group matches as black": select(Match).filter(
+            Match.tournament_id == tid, Match.black_team_id == match.black_team_id,
+            Match.is_completed == True, Match.label == MatchLabel.group),
+        "bracket feeders": select(Match).filter(Match.tournament_id == tid, Match.bracket_slot.in_([1, 2])),
+        "games of a match": select(Game).filter(Game.match_id == match.id).order_by(Game.board_number),
+        "game on a board": select(Game).filter(Game.match_id == match.id, Game.board_number == 1),
+        "games as white": select(Game).filter(Game.white_player_id == game.white_player_id),
+        "games as black": select(Game).filter(Game.black_player_id == game.black_player_id),
+        "players of a team": select(Player).filter(Player.team_id == match.white_team_id).order_by(Player.id),
+        "teams of a tournament": select(Team).filter(Team.tournament_id == tid),
+        "top standings": select(Team).filter(Team.tournament_id == tid).order_by(*crud.STANDINGS_ORDER).limit(10),
+        "top players": select(Player).join(Team, Player.team_id == Team.id).filter(
+            Team.tournament_id == tid).order_by(*crud.BEST_PLAYERS_ORDER).limit(10),
+        "round by number": select(Round).filter(Round.tournament_id == tid, Round.round_number == match.round_number),
+        "announcements": select(Announcement).filter(Announcement.tournament_id == tid).order_by(
+            Announcement.is_pinned.desc(), Announcement.id.desc()),
+    }
+
+def _sqlite_plan(conn, sql: str) -> Tuple[List[str], List[str], List[str]]:
+    details = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+    # "SCAN matches" reads the whole table; "SCAN matches USING INDEX ..." walks an index instead
+    scans = [d for d in details if d.startswith("SCAN ") and " USING " not in d]
+    sorts = [d for d in details if d.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in d]
+    return details, scans, sorts
+
+def _postgres_plan(conn, sql: str) -> Tuple[List[str], List[str], List[str]]:
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    details, scans, sorts = [], [], []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        detail = node["Node Type"] + (f" on {node['Relation Name']}" if "Relation Name" in node else "")
+        if "Index Name" in node:
+            detail += f" using {node['Index Name']}"
+        details.append(detail)
+        if node["Node Type"] == "Seq Scan":
+            scans.append(detail)
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            sorts.append(detail)
+        nodes.extend(node.get("Plans", ()))
+    return details, scans, sorts
+
+def explain_all() -> List[str]:
+    """EXPLAIN every hot query, print its plan and return the names of those that fail a check."""
+    from app.database import engine, SessionLocal
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        queries = hot_queries(db)
+    finally:
+        db.close()
+
+    plan = _postgres_plan if engine.dialect.name == "postgresql" else _sqlite_plan
+    failures = []
+    with engine.connect() as conn:
+        for name, query in queries.items():
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            details, scans, sorts = plan(conn, sql)
+            problem = "SEQ SCAN" if scans else "SORT" if sorts and name in INDEX_ORDERED else None
+            print(f"{problem or 'ok':<9} {name:<36} {'; '.join(details)}")
+            if problem:
+                failures.append(name)
+    return failures
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="chesshub-explain-"), "explain.db")
+    # app.database builds its engine at import time
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DEBUG", "true")
+
+    from . import runner
+    runner.prepare_database()
+    seed(args.tournaments, args.teams, args.announcements)
+
+    failures = explain_all()
+    if failures:
+        print(f"\n{len(failures)} hot queries fall back to a sequential scan or a sort: {', '.join(failures)}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
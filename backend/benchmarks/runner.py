@@ -0,0 +1,206 @@
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+from app import crud
+from app.database import engine, async_engine, SessionLocal, Base, count_queries
+from app.enums import TournamentFormat, TournamentStage, Tiebreaker
+from app.main import app
+from app.models import Game, Match, Player, Team
+from app.utilities import tournament
+from app.utilities.auth import create_token
+from app.utilities.stats import GAME_SCORES, RECOMPUTE_QUERY_BUDGET
+from . import synthetic
+
+class Recorder:
+    """Collects wall time, SQL statement count and peak traced memory per benchmark step."""
+
+    def __init__(self, track_memory: bool = True):
+        self.steps: Dict[str, Dict[str, List]] = {}
+        self.statements = 0
+        self.track_memory = track_memory
+        # Public GETs run on the async engine, whose statements go through its own sync core engine
+        self.engines = (engine, async_engine.sync_engine)
+        for e in self.engines:
+            event.listen(e, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.statements += 1
+
+    def close(self):
+        for e in self.engines:
+            event.remove(e, "before_cursor_execute", self._count)
+
+    @contextmanager
+    def measure(self, step: str):
+        entry = self.steps.setdefault(step, {"seconds": [], "statements": [], "peak_bytes": []})
+        statements = self.statements
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry["seconds"].append(time.perf_counter() - start)
+            entry["statements"].append(self.statements - statements)
+            if self.track_memory:
+                entry["peak_bytes"].append(tracemalloc.get_traced_memory()[1] - baseline)
+
+    def summary(self) -> Dict[str, Dict]:
+        report = {}
+        for step, entry in self.steps.items():
+            ms = np.array(entry["seconds"]) * 1000
+            statements = np.array(entry["statements"])
+            report[step] = {
+                "samples": len(ms),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p90_ms": round(float(np.percentile(ms, 90)), 3),
+                "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                "max_ms": round(float(ms.max()), 3),
+                "mean_ms": round(float(ms.mean()), 3),
+                "statements_mean": round(float(statements.mean()), 2),
+                "statements_max": int(statements.max()),
+                "peak_kb": round(max(entry["peak_bytes"]) / 1024, 1) if entry["peak_bytes"] else None,
+            }
+        return report
+
+@contextmanager
+def _timed(recorder: Recorder, module, name: str, step: str):
+    """Time a function that is only reachable through another call, e.g. knockout population inside complete_round."""
+    original = getattr(module, name)
+
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        with recorder.measure(step):
+            return original(*args, **kwargs)
+
+    setattr(module, name, wrapper)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+def _play_round(client: TestClient, headers: dict, recorder: Recorder, tournament_id: int,
+                round_number: int, http_results: int, rng: random.Random):
+    db = SessionLocal()
+    try:
+        games = db.query(Game.id, Game.match_id, Game.board_number).join(Match, Game.match_id == Match.id).filter(
+            Match.tournament_id == tournament_id,
+            Match.round_number == round_number
+        ).order_by(Game.id).all()
+
+        for game in games[:http_results]:
+            with recorder.measure("submit_board_result"):
+                response = client.post(
+                    f"/api/matches/{game.match_id}/result",
+                    params={"board_number": game.board_number},
+                    json={"result": synthetic.random_result(rng).value},
+                    headers=headers,
+                )
+            response.raise_for_status()
+
+        # Boards beyond the sampled ones are filled in bulk so large rounds stay affordable
+        bulk = []
+        for game in games[http_results:]:
+            result = synthetic.random_result(rng)
+            white_score, black_score = GAME_SCORES[result]
+            bulk.append({"id": game.id, "result": result, "white_score": white_score,
+                         "black_score": black_score, "is_completed": True})
+        if bulk:
+            db.execute(update(Game), bulk)
+            db.commit()
+
+        with recorder.measure("recalculate_round_stats"):
+            tournament.recalculate_round_stats(db, tournament_id, round_number)
+        with recorder.measure("recompute_tournament_stats"):
+            with count_queries(db) as queries:
+                tournament.recompute_tournament_stats(db, tournament_id)
+            db.commit()
+        assert queries["count"] <= RECOMPUTE_QUERY_BUDGET, (
+            f"recompute_tournament_stats issued {queries['count']} statements (budget {RECOMPUTE_QUERY_BUDGET})"
+        )
+
+        pending = db.query(Match.id).filter(
+            Match.tournament_id == tournament_id,
+            Match.round_number == round_number,
+            Match.tiebreaker == Tiebreaker.pending
+        ).all()
+        for match in pending:
+            with recorder.measure("submit_tiebreaker_result"):
+                response = client.post(f"/api/matches/{match.id}/tiebreaker", json={"result": "white_win"}, headers=headers)
+            response.raise_for_status()
+    finally:
+        db.close()
+
+def _public_gets(tournament_id: int, round_numbers: List[int], team_id: int, player_id: int) -> Dict[str, str]:
+    gets = {
+        "GET /api/tournaments/current": "/api/tournaments/current",
+        "GET /api/tournaments/": "/api/tournaments/",
+        "GET /api/tournaments/{tournament_id}": f"/api/tournaments/{tournament_id}",
+        "GET /api/tournaments/{tournament_id}/standings": f"/api/tournaments/{tournament_id}/standings",
+        "GET /api/tournaments/{tournament_id}/best-players": f"/api/tournaments/{tournament_id}/best-players",
+        "GET /api/tournaments/{tournament_id}/standings/check-tie": f"/api/tournaments/{tournament_id}/standings/check-tie",
+        "GET /api/tournaments/{tournament_id}/best-players/check-tie": f"/api/tournaments/{tournament_id}/best-players/check-tie",
+        "GET /api/tournaments/{tournament_id}/announcements": f"/api/tournaments/{tournament_id}/announcements",
+        "GET /api/teams": f"/api/teams?tournament_id={tournament_id}",
+        "GET /api/teams/{team_id}": f"/api/teams/{team_id}",
+        "GET /api/players": f"/api/players?tournament_id={tournament_id}",
+        "GET /api/players/{player_id}": f"/api/players/{player_id}",
+    }
+    for round_number in round_numbers:
+        gets[f"GET /api/tournaments/{{tournament_id}}/round/{round_number}"] = f"/api/tournaments/{tournament_id}/round/{round_number}"
+        gets[f"GET /api/matches/{{tournament_id}}/{round_number}"] = f"/api/matches/{tournament_id}/{round_number}"
+    return gets
+
+def run_lifecycle(format: TournamentFormat, teams: int, http_results: int = 32, repeat: int = 20,
+                  seed: int = 0, track_memory: bool = True) -> Dict[str, Dict]:
+    """Create, play through and read back one synthetic tournament, returning per-step statistics."""
+    rng = random.Random(seed)
+    recorder = Recorder(track_memory)
+    headers = {"Authorization": f"Bearer {create_token('benchmark')}"}
+    db = SessionLocal()
+    try:
+        with TestClient(app) as client:
+            with recorder.measure("create_tournament_structure"):
+                tour = crud.create_tournament(db, synthetic.tournament_payload(format, teams))
+            tournament_id = tour.id
+            tournament.start_tournament(db, tournament_id)
+
+            with _timed(recorder, tournament, "create_knockout_round", "create_knockout_round"), \
+                    _timed(recorder, tournament, "create_swiss_round", "create_swiss_round"):
+                for round_number in range(1, tour.total_rounds + 1):
+                    _play_round(client, headers, recorder, tournament_id, round_number, http_results, rng)
+                    with recorder.measure("complete_round"):
+                        outcome = tournament.complete_round(db, tournament_id, round_number)
+                    if not outcome["completed"]:
+                        raise RuntimeError(f"Round {round_number} could not be completed: {outcome['reason']}")
+
+                    db.refresh(tour)
+                    if (format == TournamentFormat.group_knockout and round_number == tour.total_group_stage_rounds
+                            and tour.stage == TournamentStage.group):
+                        # Tied group standings hold the knockout back until an arbiter validates them
+                        response = client.post(f"/api/tournaments/{tournament_id}/standings/validate", headers=headers)
+                        response.raise_for_status()
+                        db.refresh(tour)
+
+            team_id = db.query(Team.id).filter(Team.tournament_id == tournament_id).order_by(Team.id).first()[0]
+            player_id = db.query(Player.id).filter(Player.team_id == team_id).order_by(Player.id).first()[0]
+            round_numbers = sorted({1, tour.total_group_stage_rounds, tour.total_rounds})
+            for step, url in _public_gets(tournament_id, round_numbers, team_id, player_id).items():
+                for _ in range(repeat):
+                    with recorder.measure(step):
+                        response = client.get(url)
+                    response.raise_for_status()
+    finally:
+        db.close()
+        recorder.close()
+    return recorder.summary()
+
+def prepare_database():
+    Base.metadata.create_all(bind=engine)
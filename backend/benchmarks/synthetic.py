@@ -0,0 +1,29 @@
+import random
+from typing import List
+from app import schemas
+from app.enums import TournamentFormat, MatchResult
+from app.utilities import swiss
+
+# Rough shape of real scoresheets: white scores a bit more often, a quarter of games are drawn
+RESULT_WEIGHTS = {
+    MatchResult.white_win: 0.40,
+    MatchResult.black_win: 0.35,
+    MatchResult.draw: 0.25,
+}
+
+def team_names(count: int) -> List[str]:
+    return [f"Bench Team {i + 1:04d}" for i in range(count)]
+
+def tournament_payload(format: TournamentFormat, teams: int) -> schemas.TournamentCreate:
+    return schemas.TournamentCreate(
+        name=f"Benchmark {format.value} {teams}",
+        description="Synthetic tournament generated by the benchmark suite",
+        venue="Benchmark",
+        format=format,
+        team_names=team_names(teams),
+        # A Swiss event plays the usual ceil(log2(teams)) rounds, each paired from the results before it
+        total_rounds=swiss.default_rounds(teams) if format == TournamentFormat.swiss else None,
+    )
+
+def random_result(rng: random.Random) -> MatchResult:
+    return rng.choices(list(RESULT_WEIGHTS), weights=list(RESULT_WEIGHTS.values()))[0]
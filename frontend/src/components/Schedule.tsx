@@ -187,6 +187,9 @@ const Schedule: React.FC<ScheduleProps> = ({ isAdmin, tournament, onUpdate }) =>
         'Final': 'Final',
         '3rd Place': '3rd Place Match'
       };
+      if (match.label === 'knockout') {
+        return `Knockout Match ${match.bracket_slot}`;
+      }
       return labelMap[match.label] || match.label;
     }
     return '';
@@ -241,14 +244,7 @@ const Schedule: React.FC<ScheduleProps> = ({ isAdmin, tournament, onUpdate }) =>
       return 'group'; // Default for round-robin and swiss
     }
 
-    // Calculate group stage rounds
-    if (tournament.total_rounds >= 2) {
-      const knockoutRounds = 2; // Semi-finals, Final (with 3rd place in same round)
-      const groupRounds = tournament.total_rounds - knockoutRounds;
-      return roundNumber <= groupRounds ? 'group' : 'knockout';
-    }
-    
-    return 'group';
+    return roundNumber <= tournament.total_group_stage_rounds ? 'group' : 'knockout';
   };
 
   const getRoundTitle = (roundNumber: number): string => {
@@ -263,7 +259,8 @@ const Schedule: React.FC<ScheduleProps> = ({ isAdmin, tournament, onUpdate }) =>
         return `Semi Finals`;
       } else if (roundNumber === totalRounds) {
         return `Finals`;
-      } 
+      }
+      return `Round of ${2 ** (totalRounds - roundNumber + 1)}`;
     }
   };
 
@@ -11,17 +11,41 @@ interface TeamsProps {
   onTabChange?: (tab: TabType) => void;
 }
 
+// Teams are listed a page at a time, each page with only its own teams' players
+const TEAMS_PAGE_SIZE = 24;
+
 const Teams: React.FC<TeamsProps> = ({ isAdmin, tournament, onUpdate, onTabChange }) => {
   const [teams, setTeams] = useState<Team[]>([]);
   const [players, setPlayers] = useState<Player[]>([]);
   const [showEditor, setShowEditor] = useState(false);
   const [selectedTeam, setSelectedTeam] = useState<Team | null>(null);
   const [starting, setStarting] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | undefined>();
+  const [loadingMore, setLoadingMore] = useState(false);
 
-  useEffect(() => {
+  const loadTeams = async (cursor?: string) => {
     if (!tournament) return;
-    apiService.getTeams(tournament.id).then(setTeams);
-    apiService.getPlayers(undefined, tournament.id).then(setPlayers);
+    setLoadingMore(true);
+    try {
+      const page = await apiService.getTeamsPage(tournament.id, TEAMS_PAGE_SIZE, cursor);
+      const pagePlayers = await apiService.getPlayersOfTeams(page.items.map(t => t.id));
+      setTeams(ts => (cursor ? [...ts, ...page.items] : page.items));
+      setPlayers(ps => (cursor ? [...ps, ...pagePlayers] : pagePlayers));
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load teams:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const refreshTeamPlayers = async (teamId: number) => {
+    const teamPlayers = await apiService.getPlayers(teamId);
+    setPlayers(ps => [...ps.filter(p => p.team_id !== teamId), ...teamPlayers]);
+  };
+
+  useEffect(() => {
+    loadTeams();
   }, [tournament]);
 
   const handleStartTournament = async () => {
@@ -47,21 +71,14 @@ const Teams: React.FC<TeamsProps> = ({ isAdmin, tournament, onUpdate, onTabChang
   const handleSave = async (team: Team) => {
     await apiService.updateTeam(team.id, { name: team.name });
     setTeams(ts => ts.map(t => (t.id === team.id ? team : t)));
-    
-    if (tournament) {
-      const updatedPlayers = await apiService.getPlayers(undefined, tournament.id);
-      setPlayers(updatedPlayers);
-    }
-    
+    await refreshTeamPlayers(team.id);
     setShowEditor(false);
   };
 
   const handleClose = async () => {
-    if (tournament) {
-      const updatedPlayers = await apiService.getPlayers(undefined, tournament.id);
-      setPlayers(updatedPlayers);
+    if (selectedTeam) {
+      await refreshTeamPlayers(selectedTeam.id);
     }
-    
     setShowEditor(false);
   };
 
@@ -143,6 +160,18 @@ const Teams: React.FC<TeamsProps> = ({ isAdmin, tournament, onUpdate, onTabChang
           </div>
         )}
 
+        {tournament && nextCursor && (
+          <div className="flex justify-center mt-6">
+            <button
+              onClick={() => loadTeams(nextCursor)}
+              disabled={loadingMore}
+              className="px-4 py-2 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 disabled:opacity-50 font-medium transition-colors"
+            >
+              {loadingMore ? 'Loading...' : 'Load more teams'}
+            </button>
+          </div>
+        )}
+
         {/* Team Editor Modal */}
         {showEditor && selectedTeam && (
           <TeamEditor
@@ -7,7 +7,7 @@ import {
   MatchResponse, StandingsResponse, BestPlayersResponse, LoginRequest, AuthResponse, AuthVerifyResponse,
   SwapPlayersRequest, AvailableSwapsResponse, ResultUpdate, RoundRescheduleRequest,
   StandingsTiebreakerRequest, BestPlayersTiebreakerRequest, TieCheckResponse, BestPlayersTieCheckResponse,
-  Announcement, AnnouncementCreate, AnnouncementUpdate
+  Announcement, AnnouncementCreate, AnnouncementUpdate, Page
 } from '@/types';
 
 class ApiService {
@@ -32,6 +32,13 @@ class ApiService {
     );
   }
   
+  // One page of a listing; nextCursor is set while more rows remain
+  private async getPage<T>(url: string, params: Record<string, unknown>): Promise<Page<T>> {
+    // Repeated keys (team_id=1&team_id=2) rather than axios's default team_id[]=1
+    const res = await this.client.get(url, { params, paramsSerializer: { indexes: null } });
+    return { items: res.data, nextCursor: res.headers['x-next-cursor'] as string | undefined };
+  }
+
   // -- Authentication --
   async login(data: LoginRequest): Promise<AuthResponse> {
     const res = await this.client.post('/auth/login', data);
@@ -149,6 +156,10 @@ class ApiService {
     return res.data;
   }
 
+  async getTeamsPage(tournamentId: number, limit: number, cursor?: string): Promise<Page<Team>> {
+    return this.getPage<Team>('/teams', { tournament_id: tournamentId, limit, cursor });
+  }
+
   async getTeam(teamId: number): Promise<Team> {
     const res = await this.client.get(`/teams/${teamId}`);
     return res.data;
@@ -168,6 +179,11 @@ class ApiService {
     return res.data;
   }
 
+  async getPlayersOfTeams(teamIds: number[]): Promise<Player[]> {
+    if (teamIds.length === 0) return [];
+    return (await this.getPage<Player>('/players', { team_id: teamIds })).items;
+  }
+
   async getPlayer(playerId: number): Promise<Player> {
     const res = await this.client.get(`/players/${playerId}`);
     return res.data;
@@ -20,11 +20,11 @@ export interface LoginModalProps {
 }
 
 // Enums matching backend
-export type TournamentStage = 'not_yet_started' | 'group' | 'semi_final' | 'final' | 'completed';
+export type TournamentStage = 'not_yet_started' | 'group' | 'knockout' | 'semi_final' | 'final' | 'completed';
 export type TournamentFormat = 'round_robin' | 'group_knockout' | 'swiss';
 export type MatchResult = 'pending' | 'white_win' | 'black_win' | 'draw' | 'tiebreaker';
 export type Tiebreaker = 'no_tiebreaker' | 'pending' | 'white_win' | 'black_win';
-export type MatchLabel = 'group' | 'SF1' | 'SF2' | 'Final' | '3rd Place';
+export type MatchLabel = 'group' | 'knockout' | 'SF1' | 'SF2' | 'Final' | '3rd Place';
 
 // Tournament Types - Matching TournamentResponse schema
 export interface Tournament {
@@ -42,6 +42,7 @@ export interface Tournament {
   announcements?: Announcement[];
   group_standings_validated: boolean;
   best_players_validated: boolean;
+  knockout_size?: number | null;
 }
 
 // Matching TournamentCreate schema  
@@ -53,6 +54,9 @@ export interface TournamentCreate {
   end_date?: string;
   format: TournamentFormat;
   team_names: string[];
+  total_rounds?: number;
+  group_count?: number;
+  knockout_size?: number;
 }
 
 // Matching TournamentUpdate schema
@@ -133,6 +137,7 @@ export interface MatchResponse {
   games: GameResponse[];
   tiebreaker: Tiebreaker;
   group: number;
+  bracket_slot?: number | null;
 }
 
 // Standings Types - Matching StandingsEntry schema from CRUD
@@ -151,8 +156,16 @@ export interface StandingsEntry {
 }
 
 // Matching StandingsResponse schema
+// Rows level on every ranking key, returned when ?ties=true is requested
+export interface TieCluster {
+  group: number | null;
+  rank: number;
+  ids: number[];
+}
+
 export interface StandingsResponse {
   standings: StandingsEntry[];
+  tie_clusters?: TieCluster[] | null;
 }
 
 // Best Players Types - Matching BestPlayerEntry schema from CRUD
@@ -170,6 +183,22 @@ export interface BestPlayerEntry {
 // Matching BestPlayersResponse schema
 export interface BestPlayersResponse {
   players: BestPlayerEntry[];
+  tie_clusters?: TieCluster[] | null;
+}
+
+// Matching ProgressionResponse schema: one entry per completed round
+export interface TeamProgression {
+  team_id: number;
+  team_name: string;
+  group: number;
+  rank: number[];
+  match_points: number[];
+  game_points: number[];
+}
+
+export interface ProgressionResponse {
+  rounds: number[];
+  teams: TeamProgression[];
 }
 
 // Authentication Types
@@ -267,4 +296,9 @@ export interface AnnouncementUpdate {
   title?: string;
   content?: string;
   is_pinned?: boolean;
-}
\ No newline at end of file
+}
+// A page of a cursor-paged listing; pass nextCursor back to fetch the following one
+export interface Page<T> {
+  items: T[];
+  nextCursor?: string;
+}